@@ -0,0 +1,88 @@
+import random
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from email.utils import format_datetime
+from typing import Any
+
+
+_CHARSETS = ["utf-8", "gbk", "iso-8859-1", "us-ascii"]
+_SAMPLE_TEXT = {
+    "utf-8": "Résumé naïve café — 数据抓取 ",
+    "gbk": "数据抓取服务测试邮件 ",
+    "iso-8859-1": "Grüße aus München ",
+    "us-ascii": "Plain ascii mail body ",
+}
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_messages(count: int, seed: int = 7) -> list[bytes]:
+    rng = random.Random(seed)
+    return [_make_message(i, rng) for i in range(count)]
+
+
+def _make_message(index: int, rng: random.Random) -> bytes:
+    charset = rng.choice(_CHARSETS)
+    text = _SAMPLE_TEXT[charset] * rng.choice([5, 40, 400, 2000])
+    msg = EmailMessage()
+    msg["Subject"] = f"{_SAMPLE_TEXT[charset].strip()} #{index}"
+    msg["From"] = f"sender{index % 97}@bench.local"
+    msg["To"] = "inbox@bench.local"
+    msg["Message-ID"] = f"<bench-{index}@bench.local>"
+    msg["Date"] = format_datetime(_EPOCH + timedelta(minutes=index))
+    msg.set_content(text, charset=charset)
+    if rng.random() < 0.5:
+        msg.add_alternative(f"<html><body><p>{text}</p></body></html>", subtype="html", charset=charset)
+    if rng.random() < 0.2:
+        payload = rng.randbytes(rng.choice([2_000, 50_000, 400_000]))
+        msg.add_attachment(
+            payload, maintype="application", subtype="octet-stream", filename=f"file-{index}.bin"
+        )
+    return msg.as_bytes()
+
+
+def make_feed(feed_index: int, entries: int, atom: bool = False) -> bytes:
+    items = []
+    for i in range(entries):
+        published = format_datetime(_EPOCH + timedelta(hours=i))
+        link = f"https://bench.local/feeds/{feed_index}/{i}"
+        summary = f"Summary of article {i} in feed {feed_index}. " * 8
+        if atom:
+            items.append(
+                f"<entry><title>Article {i}</title><link href=\"{link}\"/>"
+                f"<id>{link}</id><updated>{(_EPOCH + timedelta(hours=i)).isoformat()}</updated>"
+                f"<author><name>Author {i % 5}</name></author>"
+                f"<summary>{summary}</summary>"
+                f"<content type=\"html\">&lt;p&gt;{summary}&lt;/p&gt;</content></entry>"
+            )
+        else:
+            items.append(
+                f"<item><title>Article {i}</title><link>{link}</link>"
+                f"<guid>{link}</guid><pubDate>{published}</pubDate>"
+                f"<author>author{i % 5}@bench.local</author>"
+                f"<description>{summary}</description></item>"
+            )
+    if atom:
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<feed xmlns="http://www.w3.org/2005/Atom">'
+            f"<title>Bench feed {feed_index}</title>{''.join(items)}</feed>"
+        ).encode()
+    return (
+        '<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+        f"<title>Bench feed {feed_index}</title>{''.join(items)}</channel></rss>"
+    ).encode()
+
+
+def make_documents(count: int, seed: int = 7) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "_id": f"{i:012d}",
+            "title": f"Document {i}",
+            "score": rng.random(),
+            "tags": [f"tag{rng.randrange(50)}" for _ in range(rng.randrange(1, 6))],
+            "body": "x" * rng.choice([100, 1_000, 10_000]),
+            "nested": {"source": "bench", "rank": i},
+        }
+        for i in range(count)
+    ]
@@ -0,0 +1,259 @@
+import asyncio
+import copy
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Iterator, Optional
+
+import bson
+from bson.raw_bson import RawBSONDocument
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+
+
+def _get(doc: dict[str, Any], path: str) -> Any:
+    for key in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(key)
+    return doc
+
+
+class MemoryCursor:
+    def __init__(
+        self,
+        docs: list[dict[str, Any]],
+        projection: Optional[dict] = None,
+        read_latency: float = 0.0,
+        encoded: Optional[dict[Any, bytes]] = None,
+        document_class: type = dict,
+    ):
+        self._docs = docs
+        self._projection = projection
+        self._read_latency = read_latency
+        self._encoded = encoded or {}
+        self._document_class = document_class
+        self._batch_size = 1000
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key: str | list[tuple[str, int]], direction: int = 1) -> "MemoryCursor":
+        keys = [(key, direction)] if isinstance(key, str) else key
+        for path, order in reversed(keys):
+            self._docs = sorted(
+                self._docs, key=lambda doc: _get(doc, path), reverse=order < 0
+            )
+        return self
+
+    def skip(self, count: int) -> "MemoryCursor":
+        self._skip = count
+        return self
+
+    def limit(self, count: int) -> "MemoryCursor":
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int) -> "MemoryCursor":
+        self._batch_size = size
+        return self
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        docs = self._docs[self._skip :]
+        docs = docs[: self._limit] if self._limit else docs
+        for i, doc in enumerate(docs):
+            if self._read_latency and i % self._batch_size == 0:
+                time.sleep(self._read_latency)
+            yield self._project(doc)
+
+    def __aiter__(self):
+        return self._aiter()
+
+    async def _aiter(self):
+        for doc in self:
+            yield doc
+
+    async def to_list(self, length: Optional[int] = None) -> list[dict[str, Any]]:
+        return list(self)
+
+    def _project(self, doc: dict[str, Any]) -> dict[str, Any]:
+        if not self._projection:
+            raw = self._encoded.get(doc["_id"])
+            if raw is None:
+                return dict(doc)
+            if self._document_class is RawBSONDocument:
+                return RawBSONDocument(raw)
+            return bson.decode(raw)
+        return {
+            key: value
+            for key, value in doc.items()
+            if key == "_id" or key in self._projection
+        }
+
+
+class MemoryCollection:
+    def __init__(self, name: str, write_latency: float = 0.0, read_latency: float = 0.0):
+        self.name = name
+        self.docs: dict[Any, dict[str, Any]] = {}
+        self.encoded: dict[Any, bytes] = {}
+        self._write_latency = write_latency
+        self._read_latency = read_latency
+        self._document_class: type = dict
+        self._lock = threading.Lock()
+
+    def with_options(self, codec_options: Any) -> "MemoryCollection":
+        view = copy.copy(self)
+        view._document_class = codec_options.document_class
+        return view
+
+    def insert_many(self, docs: list[dict[str, Any]]) -> None:
+        with self._lock:
+            for doc in docs:
+                self.docs[doc["_id"]] = dict(doc)
+                self.encoded[doc["_id"]] = bson.encode(doc)
+
+    def find(
+        self, query: Optional[dict] = None, projection: Optional[dict] = None
+    ) -> MemoryCursor:
+        query = query or {}
+        with self._lock:
+            if isinstance(query.get("_id"), dict) and "$in" in query["_id"]:
+                candidates = [self.docs[i] for i in query["_id"]["$in"] if i in self.docs]
+            else:
+                candidates = list(self.docs.values())
+            docs = [doc for doc in candidates if self._matches(doc, query)]
+        return MemoryCursor(
+            docs, projection, self._read_latency, self.encoded, self._document_class
+        )
+
+    def aggregate(self, pipeline: list[dict[str, Any]]) -> MemoryCursor:
+        with self._lock:
+            docs = list(self.docs.values())
+        projection = None
+        cursor = MemoryCursor(docs)
+        for stage in pipeline:
+            if "$sample" in stage:
+                size = min(stage["$sample"]["size"], len(docs))
+                cursor = MemoryCursor(random.sample(docs, size), projection)
+            elif "$project" in stage:
+                projection = stage["$project"]
+                cursor._projection = projection
+            elif "$sort" in stage:
+                (key, direction), = stage["$sort"].items()
+                cursor.sort(key, direction)
+        return cursor
+
+    async def find_one(self, query: dict) -> Optional[dict[str, Any]]:
+        return next(iter(self.find(query)), None)
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False) -> None:
+        self._apply(UpdateOne(query, update, upsert=upsert))
+
+    async def delete_one(self, query: dict) -> None:
+        with self._lock:
+            self.docs.pop(query["_id"], None)
+
+    async def bulk_write(self, ops: list[UpdateOne], ordered: bool = True) -> SimpleNamespace:
+        if self._write_latency:
+            await asyncio.sleep(self._write_latency)
+        upserted = modified = deleted = 0
+        for op in ops:
+            if isinstance(op, DeleteOne):
+                with self._lock:
+                    deleted += self.docs.pop(op._filter["_id"], None) is not None
+                continue
+            if isinstance(op, ReplaceOne):
+                with self._lock:
+                    current = self.docs.get(op._filter["_id"])
+                    self.docs[op._filter["_id"]] = op._doc
+                upserted += current is None
+                modified += current is not None and current != op._doc
+                continue
+            inserted, changed = self._apply(op)
+            upserted += inserted
+            modified += changed
+        return SimpleNamespace(
+            upserted_count=upserted,
+            modified_count=modified,
+            matched_count=modified,
+            deleted_count=deleted,
+        )
+
+    def _apply(self, op: UpdateOne) -> tuple[int, int]:
+        doc_id = op._filter["_id"]
+        update = op._doc
+        with self._lock:
+            current = self.docs.get(doc_id)
+            if current is None:
+                if not op._upsert:
+                    return 0, 0
+                created = self._set({"_id": doc_id}, update.get("$setOnInsert", {}))
+                self.docs[doc_id] = self._set(created, update.get("$set", {}))
+                return 1, 0
+            updated = self._set(dict(current), update.get("$set", {}))
+            self.docs[doc_id] = updated
+            return 0, int(updated != current)
+
+    @staticmethod
+    def _set(doc: dict[str, Any], fields: dict[str, Any]) -> dict[str, Any]:
+        for path, value in fields.items():
+            *parents, leaf = path.split(".")
+            target = doc
+            for key in parents:
+                target[key] = dict(target.get(key) or {})
+                target = target[key]
+            target[leaf] = value
+        return doc
+
+    _operators = {
+        "$gt": lambda value, bound: value is not None and value > bound,
+        "$gte": lambda value, bound: value is not None and value >= bound,
+        "$lt": lambda value, bound: value is not None and value < bound,
+        "$lte": lambda value, bound: value is not None and value <= bound,
+        "$in": lambda value, options: value in options,
+    }
+
+    @classmethod
+    def _matches(cls, doc: dict[str, Any], query: dict[str, Any]) -> bool:
+        for key, condition in query.items():
+            if key == "$or":
+                if not any(cls._matches(doc, clause) for clause in condition):
+                    return False
+                continue
+            value = _get(doc, key)
+            if not isinstance(condition, dict):
+                if value != condition:
+                    return False
+                continue
+            for operator, operand in condition.items():
+                if not cls._operators[operator](value, operand):
+                    return False
+        return True
+
+
+class MemoryDatabase:
+    def __init__(self, write_latency: float = 0.0, read_latency: float = 0.0):
+        self._collections: dict[str, MemoryCollection] = {}
+        self._write_latency = write_latency
+        self._read_latency = read_latency
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(
+                name, self._write_latency, self._read_latency
+            )
+        return self._collections[name]
+
+
+class MemoryClient:
+    def __init__(self, write_latency: float = 0.0, read_latency: float = 0.0):
+        self._databases: dict[str, MemoryDatabase] = {}
+        self._write_latency = write_latency
+        self._read_latency = read_latency
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        if name not in self._databases:
+            self._databases[name] = MemoryDatabase(self._write_latency, self._read_latency)
+        return self._databases[name]
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,316 @@
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Callable, Optional
+from unittest import mock
+
+from benchmarks.fixtures import make_documents, make_feed, make_messages
+from benchmarks.mongo import MemoryClient
+from benchmarks.servers import (
+    LocalServer,
+    Mailbox,
+    feed_server,
+    imap_server,
+    pop3_server,
+)
+from src.crawlers.base import Crawler
+from src.crawlers.mail import MailAccount, MailCrawler
+from src.crawlers.mongo import MongoCrawler
+from src.crawlers.rss import RssCrawler
+from src.infrastructure.database import Database
+from src.infrastructure.executor import shutdown_executor
+from src.infrastructure.metrics import STAGE_SECONDS
+
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+STAGES = ("fetch", "parse", "save")
+MIN_LATENCY_SAMPLES = 20
+PROFILES: dict[str, list[tuple[str, dict[str, Any]]]] = {
+    "quick": [
+        ("mail", {"protocol": "imap", "messages": 300}),
+        ("mail", {"protocol": "pop3", "messages": 300}),
+        ("rss", {"feeds": 10, "entries": 50, "latency": 0.02}),
+        ("mongo", {"documents": 5_000, "stream": True}),
+    ],
+    "full": [
+        ("mail", {"protocol": "imap", "messages": 300}),
+        ("mail", {"protocol": "imap", "messages": 2_000}),
+        ("mail", {"protocol": "imap", "messages": 2_000, "folders": 8}),
+        ("mail", {"protocol": "pop3", "messages": 300}),
+        ("mail", {"protocol": "pop3", "messages": 2_000}),
+        ("rss", {"feeds": 10, "entries": 50, "latency": 0.02}),
+        ("rss", {"feeds": 100, "entries": 100, "latency": 0.05}),
+        ("mongo", {"documents": 5_000, "stream": True}),
+        ("mongo", {"documents": 50_000, "stream": True}),
+        ("mongo", {"documents": 50_000, "stream": False}),
+        ("mongo", {"documents": 50_000, "stream": True, "raw": True}),
+        ("mongo", {"documents": 50_000, "stream": True, "read_latency": 0.1}),
+        ("mongo", {"documents": 50_000, "stream": True, "read_latency": 0.1, "partitions": 4}),
+    ],
+}
+
+
+@dataclass
+class BenchResult:
+    scenario: str
+    items: int
+    seconds: float
+    items_per_sec: float
+    peak_rss_mb: float
+    latency: dict[str, dict[str, float]] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class StageRecorder:
+    def __init__(self, crawler: type[Crawler]):
+        self._children = [
+            (stage, STAGE_SECONDS.labels(crawler.__name__, stage)) for stage in STAGES
+        ]
+        self.samples: dict[str, list[float]] = {stage: [] for stage in STAGES}
+
+    def __enter__(self) -> "StageRecorder":
+        for stage, child in self._children:
+            child.observe = self._recording(child.observe, self.samples[stage])
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        for _, child in self._children:
+            del child.observe
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        return {
+            stage: {
+                "count": len(samples),
+                "p50_ms": round(self._percentile(samples, 50) * 1000, 3),
+                "p99_ms": round(self._percentile(samples, 99) * 1000, 3),
+            }
+            for stage, samples in self.samples.items()
+            if samples
+        }
+
+    @staticmethod
+    def _recording(observe: Callable[[float], None], samples: list[float]) -> Callable:
+        def record(value: float) -> None:
+            samples.append(value)
+            observe(value)
+
+        return record
+
+    @staticmethod
+    def _percentile(samples: list[float], percent: int) -> float:
+        if len(samples) == 1:
+            return samples[0]
+        return statistics.quantiles(samples, n=100, method="inclusive")[percent - 1]
+
+
+def scenario_key(kind: str, params: dict[str, Any]) -> str:
+    return kind + ":" + ",".join(f"{key}={value}" for key, value in params.items())
+
+
+CrawlerFactory = Callable[[int], Crawler]
+
+
+def _mail_scenario(
+    protocol: str, messages: int, folders: int = 1
+) -> tuple[LocalServer, CrawlerFactory]:
+    raws = make_messages(messages)
+    boxes = [Mailbox(raws[i::folders]) for i in range(folders)]
+    if protocol == "imap":
+        extra = {f"Archive/{i}": box for i, box in enumerate(boxes[1:], 1)}
+        server = imap_server(boxes[0], extra)
+    else:
+        server = pop3_server(boxes[0])
+    crawler_args = {
+        "database": "bench",
+        "collection": "mail",
+        "folders": ["INBOX", "Archive/*"],
+        "incremental": False,
+    }
+    return server, lambda port: MailCrawler(
+        accounts=[MailAccount("127.0.0.1", port, "bench", "bench", False, protocol)],
+        **crawler_args,
+    )
+
+
+def _rss_scenario(
+    feeds: int, entries: int, latency: float
+) -> tuple[LocalServer, CrawlerFactory]:
+    payloads = {f"/feeds/{i}": make_feed(i, entries, atom=i % 2 == 1) for i in range(feeds)}
+    server = feed_server(payloads, latency)
+    return server, lambda port: RssCrawler(
+        urls=[f"http://127.0.0.1:{port}{path}" for path in payloads],
+        database="bench",
+        collection="rss",
+        use_cache=False,
+    )
+
+
+async def _run(kind: str, params: dict[str, Any], write_latency: float) -> BenchResult:
+    target = Database(MemoryClient(write_latency), "bench")
+    if kind == "mongo":
+        return await _run_mongo(params, target)
+    builder = _mail_scenario if kind == "mail" else _rss_scenario
+    server, make_crawler = builder(**params)
+    with server:
+        crawler = make_crawler(server.port)
+        return await _measure(scenario_key(kind, params), crawler, target)
+
+
+async def _run_mongo(params: dict[str, Any], target: Database) -> BenchResult:
+    source = MemoryClient(read_latency=params.get("read_latency", 0.0))
+    source["bench"]["source"].insert_many(make_documents(params["documents"]))
+    clients = mock.Mock()
+    clients.acquire_sync.return_value = source
+    with mock.patch("src.crawlers.mongo.get_mongo_clients", return_value=clients):
+        crawler = MongoCrawler(
+            source_uri="mongodb://bench.local",
+            source_database="bench",
+            source_collection="source",
+            target_database="bench",
+            target_collection="copy",
+            stream=params["stream"],
+            resume=False,
+            partitions=params.get("partitions", 1),
+            raw=params.get("raw", False),
+        )
+        return await _measure(scenario_key("mongo", params), crawler, target)
+
+
+async def _measure(name: str, crawler: Crawler, target: Database) -> BenchResult:
+    with StageRecorder(type(crawler)) as recorder:
+        start = time.perf_counter()
+        result = await crawler.execute(target)
+        seconds = time.perf_counter() - start
+    items = result.get("total", 0)
+    return BenchResult(
+        scenario=name,
+        items=items,
+        seconds=round(seconds, 3),
+        items_per_sec=round(items / seconds, 1) if seconds else 0.0,
+        peak_rss_mb=round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        latency=recorder.summary(),
+    )
+
+
+def _child(kind: str, params: dict[str, Any], write_latency: float, conn) -> None:
+    logging.disable(logging.INFO)
+    try:
+        conn.send(asyncio.run(_run(kind, params, write_latency)).to_dict())
+    except Exception as e:
+        conn.send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        shutdown_executor()
+        conn.close()
+
+
+def run_scenario(kind: str, params: dict[str, Any], write_latency: float) -> dict[str, Any]:
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_child, args=(kind, params, write_latency, sender))
+    process.start()
+    sender.close()
+    result = receiver.recv()
+    process.join()
+    return result
+
+
+def compare(
+    results: list[dict[str, Any]],
+    baseline: dict[str, Any],
+    tolerance: float,
+    latency_tolerance: float,
+) -> list[str]:
+    regressions = []
+    for result in results:
+        base = baseline.get(result["scenario"])
+        if not base or "error" in result:
+            continue
+        if result["items_per_sec"] < base["items_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{result['scenario']}: throughput {result['items_per_sec']}/s "
+                f"< baseline {base['items_per_sec']}/s"
+            )
+        if result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(
+                f"{result['scenario']}: peak RSS {result['peak_rss_mb']}MB "
+                f"> baseline {base['peak_rss_mb']}MB"
+            )
+        for stage, latency in result["latency"].items():
+            if latency["count"] < MIN_LATENCY_SAMPLES:
+                continue
+            base_p99 = base.get("latency", {}).get(stage, {}).get("p99_ms")
+            if base_p99 and latency["p99_ms"] > base_p99 * (1 + latency_tolerance):
+                regressions.append(
+                    f"{result['scenario']}: {stage} p99 {latency['p99_ms']}ms "
+                    f"> baseline {base_p99}ms"
+                )
+    return regressions
+
+
+def _format(result: dict[str, Any]) -> str:
+    if "error" in result:
+        return f"{result['scenario']:<45} ERROR {result['error']}"
+    latency = "  ".join(
+        f"{stage} {values['p50_ms']}/{values['p99_ms']}ms"
+        for stage, values in result["latency"].items()
+    )
+    return (
+        f"{result['scenario']:<45} {result['items']:>7} items "
+        f"{result['items_per_sec']:>10.1f}/s  rss {result['peak_rss_mb']:>7.1f}MB  {latency}"
+    )
+
+
+def _load_baseline(path: Path) -> dict[str, Any]:
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline crawler benchmarks")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--only", choices=["mail", "rss", "mongo"])
+    parser.add_argument("--write-latency", type=float, default=0.002)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--latency-tolerance", type=float, default=0.5)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--json", type=Path, help="Write raw results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for kind, params in PROFILES[args.profile]:
+        if args.only and kind != args.only:
+            continue
+        result = run_scenario(kind, params, args.write_latency)
+        result.setdefault("scenario", scenario_key(kind, params))
+        results.append(result)
+        print(_format(result), flush=True)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+    baseline = _load_baseline(args.baseline)
+    if args.update_baseline:
+        baseline.update({r["scenario"]: r for r in results if "error" not in r})
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance, args.latency_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    failed = regressions or any("error" in r for r in results)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
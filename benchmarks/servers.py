@@ -0,0 +1,207 @@
+import re
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class Mailbox:
+    def __init__(self, messages: list[bytes], uidvalidity: int = 1):
+        self.messages = list(messages)
+        self.uids = list(range(1, len(messages) + 1))
+        self.uidvalidity = uidvalidity
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class _ImapHandler(socketserver.StreamRequestHandler):
+    _uid_range = re.compile(r"UID (\S+)")
+
+    def handle(self) -> None:
+        self._box: Mailbox = self.server.folders["INBOX"]
+        self._write(b"* OK [CAPABILITY IMAP4rev1] ready\r\n")
+        while line := self.rfile.readline():
+            tag, _, rest = line.decode().rstrip("\r\n").partition(" ")
+            command, _, args = rest.partition(" ")
+            command = command.upper()
+            if command == "LOGOUT":
+                self._write(f"* BYE\r\n{tag} OK done\r\n".encode())
+                return
+            if not self._dispatch(command, args):
+                self._write(f"{tag} BAD unknown command\r\n".encode())
+                continue
+            self._write(f"{tag} OK done\r\n".encode())
+
+    def _dispatch(self, command: str, args: str) -> bool:
+        folders: dict[str, Mailbox] = self.server.folders
+        if command in ("CAPABILITY", "LOGIN", "NOOP", "CLOSE"):
+            return True
+        if command == "LIST":
+            for name in folders:
+                self._write(f'* LIST (\\HasNoChildren) "/" "{name}"\r\n'.encode())
+            return True
+        if command in ("SELECT", "EXAMINE"):
+            name = args.strip().strip('"')
+            if name not in folders:
+                return False
+            box = self._box = folders[name]
+            self._write(
+                f"* {len(box.messages)} EXISTS\r\n"
+                f"* OK [UIDVALIDITY {box.uidvalidity}] ok\r\n".encode()
+            )
+            return True
+        if command != "UID":
+            return False
+        box = self._box
+        sub, _, rest = args.partition(" ")
+        if sub.upper() == "SEARCH":
+            match = self._uid_range.search(rest)
+            ranges = self._parse_set(match.group(1) if match else "1:*", box)
+            uids = [uid for uid in box.uids if self._in_ranges(uid, ranges)]
+            self._write(("* SEARCH " + " ".join(map(str, uids))).rstrip().encode() + b"\r\n")
+            return True
+        if sub.upper() == "FETCH":
+            spec, _, items = rest.partition(" ")
+            ranges = self._parse_set(spec, box)
+            for seq, (uid, raw) in enumerate(zip(box.uids, box.messages), 1):
+                if self._in_ranges(uid, ranges):
+                    self._write_message(seq, uid, raw, items.upper())
+            return True
+        return False
+
+    def _write_message(self, seq: int, uid: int, raw: bytes, items: str) -> None:
+        if "HEADER" in items:
+            header = raw.split(b"\n\n", 1)[0].split(b"\r\n\r\n", 1)[0] + b"\r\n\r\n"
+            self._write(
+                f"* {seq} FETCH (UID {uid} RFC822.SIZE {len(raw)} "
+                f"BODY[HEADER] {{{len(header)}}}\r\n".encode() + header + b")\r\n"
+            )
+        else:
+            self._write(
+                f"* {seq} FETCH (UID {uid} RFC822 {{{len(raw)}}}\r\n".encode() + raw + b")\r\n"
+            )
+
+    @staticmethod
+    def _parse_set(spec: str, box: Mailbox) -> list[tuple[int, int]]:
+        highest = box.uids[-1] if box.uids else 0
+        ranges = []
+        for part in spec.split(","):
+            start, _, end = part.partition(":")
+            low = highest if start == "*" else int(start)
+            high = low if not end else highest if end == "*" else int(end)
+            ranges.append((min(low, high), max(low, high)))
+        return ranges
+
+    @staticmethod
+    def _in_ranges(uid: int, ranges: list[tuple[int, int]]) -> bool:
+        return any(low <= uid <= high for low, high in ranges)
+
+    def _write(self, data: bytes) -> None:
+        self.wfile.write(data)
+
+
+class _PopHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        box: Mailbox = self.server.mailbox
+        self._write(b"+OK ready\r\n")
+        while line := self.rfile.readline():
+            parts = line.decode().split()
+            command = parts[0].upper() if parts else ""
+            if command in ("USER", "PASS", "NOOP"):
+                self._write(b"+OK\r\n")
+            elif command == "CAPA":
+                self._write(b"+OK\r\n")
+                self._multiline([b"USER", b"UIDL", b"TOP", b"PIPELINING"])
+            elif command == "STAT":
+                self._write(f"+OK {len(box.messages)} {sum(map(len, box.messages))}\r\n".encode())
+            elif command == "UIDL":
+                self._write(b"+OK\r\n")
+                self._multiline([f"{i} uid-{uid}".encode() for i, uid in enumerate(box.uids, 1)])
+            elif command == "LIST":
+                self._write(b"+OK\r\n")
+                self._multiline([f"{i} {len(raw)}".encode() for i, raw in enumerate(box.messages, 1)])
+            elif command in ("RETR", "TOP"):
+                raw = box.messages[int(parts[1]) - 1].replace(b"\r\n", b"\n")
+                if command == "TOP":
+                    raw = raw.split(b"\n\n", 1)[0] + b"\n"
+                self._write(f"+OK {len(raw)} octets\r\n".encode())
+                self._multiline(raw.split(b"\n"))
+            elif command == "QUIT":
+                self._write(b"+OK bye\r\n")
+                return
+            else:
+                self._write(b"-ERR unknown command\r\n")
+
+    def _multiline(self, lines: list[bytes]) -> None:
+        self._write(
+            b"".join((b"." + line if line.startswith(b".") else line) + b"\r\n" for line in lines)
+            + b".\r\n"
+        )
+
+    def _write(self, data: bytes) -> None:
+        self.wfile.write(data)
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        feeds: dict[str, bytes] = self.server.feeds
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        body = feeds.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class LocalServer:
+    def __init__(self, server: socketserver.BaseServer):
+        self._server = server
+        self._thread = threading.Thread(target=server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def __enter__(self) -> "LocalServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def imap_server(mailbox: Mailbox, folders: Optional[dict[str, Mailbox]] = None) -> LocalServer:
+    server = _Server(("127.0.0.1", 0), _ImapHandler)
+    server.folders = {"INBOX": mailbox, **(folders or {})}
+    return LocalServer(server)
+
+
+def pop3_server(mailbox: Mailbox) -> LocalServer:
+    server = _Server(("127.0.0.1", 0), _PopHandler)
+    server.mailbox = mailbox
+    return LocalServer(server)
+
+
+def feed_server(feeds: dict[str, bytes], latency: Optional[float] = None) -> LocalServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FeedHandler)
+    server.daemon_threads = True
+    server.feeds = feeds
+    server.latency = latency
+    return LocalServer(server)
@@ -0,0 +1,88 @@
+from pydantic import BaseModel
+
+from src.api.schemas import (
+    CRAWL_REQUEST_MODELS,
+    MailCrawlRequest,
+    MongoCrawlRequest,
+    RssCrawlRequest,
+)
+from src.config.settings import get_settings
+from src.crawlers.base import Crawler
+from src.crawlers.mail import MailAccount, MailCrawler
+from src.crawlers.mongo import MongoCrawler, SourceQuery
+from src.crawlers.rss import RssCrawler
+from src.infrastructure.database import from_extended_json
+
+
+def build_crawler(kind: str, req: BaseModel) -> Crawler:
+    if kind == "mail":
+        return _build_mail(req)
+    if kind == "rss":
+        return _build_rss(req)
+    if kind == "mongo":
+        return _build_mongo(req)
+    raise ValueError(f"Unknown crawler kind: {kind}")
+
+
+def build_crawler_from_dict(kind: str, data: dict) -> Crawler:
+    return build_crawler(kind, CRAWL_REQUEST_MODELS[kind].model_validate(data))
+
+
+def _build_mail(req: MailCrawlRequest) -> MailCrawler:
+    settings = get_settings()
+    primary = MailAccount(
+        server=req.server,
+        port=req.port,
+        username=req.username,
+        password=req.password,
+        use_ssl=req.use_ssl,
+        protocol=req.protocol,
+    )
+    return MailCrawler(
+        accounts=[primary] + [MailAccount(**account.model_dump()) for account in req.accounts],
+        database=req.database,
+        collection=req.collection,
+        folders=req.folders,
+        limit=req.limit,
+        incremental=req.incremental,
+        headers_only=req.headers_only,
+        chunk_size=settings.mail_fetch_chunk_size,
+        store_attachments=req.store_attachments,
+        max_connections=settings.mail_max_connections,
+        max_per_server=settings.mail_max_per_server,
+    )
+
+
+def _build_rss(req: RssCrawlRequest) -> RssCrawler:
+    return RssCrawler(
+        urls=req.urls,
+        database=req.database,
+        collection=req.collection,
+        use_cache=req.use_cache,
+    )
+
+
+def _build_mongo(req: MongoCrawlRequest) -> MongoCrawler:
+    return MongoCrawler(
+        source_uri=req.source_uri,
+        source_database=req.source_database,
+        source_collection=req.source_collection,
+        target_database=req.target_database,
+        target_collection=req.target_collection,
+        limit=req.limit,
+        stream=req.stream,
+        batch_size=req.batch_size,
+        resume=req.resume,
+        partitions=req.partitions,
+        sync=req.sync,
+        sync_field=req.sync_field,
+        tail_seconds=req.tail_seconds,
+        query=SourceQuery(
+            filter=from_extended_json(req.filter or {}),
+            projection=req.projection,
+            sort=req.sort,
+            hint=req.hint,
+            pipeline=from_extended_json(req.pipeline) if req.pipeline else None,
+        ),
+        raw=req.raw,
+    )
@@ -1,69 +1,108 @@
-from fastapi import APIRouter, BackgroundTasks
+from datetime import datetime, timezone
 
-from src.api.schemas import MailCrawlRequest, MongoCrawlRequest, RssCrawlRequest, CrawlResponse
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from src.api.factory import build_crawler
+from src.api.schemas import (
+    CrawlResponse,
+    JobResponse,
+    MailCrawlRequest,
+    MongoCrawlRequest,
+    RssCrawlRequest,
+    ScheduleRequest,
+    ScheduleResponse,
+)
 from src.config.settings import get_settings
-from src.crawlers.mail import MailCrawler
-from src.crawlers.mongo import MongoCrawler
-from src.crawlers.rss import RssCrawler
-from src.infrastructure.database import Database
 from src.infrastructure.logger import setup_logger
+from src.jobs.manager import QueueFullError, get_job_manager
+from src.jobs.queue import get_job_queue
+from src.jobs.scheduler import get_scheduler
 
 
 router = APIRouter()
 logger = setup_logger(__name__)
 
 
-async def _execute_crawler(crawler, mongo_uri: str, database: str):
-    crawler_name = crawler.__class__.__name__
-    logger.info(f"Starting {crawler_name}")
-    
-    db = Database(mongo_uri, database)
+def _schedule_response(schedule: dict) -> ScheduleResponse:
+    return ScheduleResponse(
+        id=schedule["_id"],
+        kind=schedule["kind"],
+        interval_seconds=schedule["interval_seconds"],
+        jitter_seconds=schedule["jitter_seconds"],
+        enabled=schedule["enabled"],
+        next_run_at=datetime.fromtimestamp(schedule["next_run_at"], timezone.utc),
+        last_run_at=(
+            datetime.fromtimestamp(schedule["last_run_at"], timezone.utc)
+            if schedule.get("last_run_at")
+            else None
+        ),
+        last_job_id=schedule.get("last_job_id"),
+    )
+
+
+async def _submit(kind: str, req: BaseModel) -> CrawlResponse:
+    settings = get_settings()
     try:
-        result = await crawler.execute(db)
-        logger.info(f"{crawler_name} completed: {result}")
-    except Exception as e:
-        logger.error(f"{crawler_name} failed: {e}", exc_info=True)
-    finally:
-        db.close()
+        if settings.job_backend == "mongo":
+            job_id = await get_job_queue().enqueue(kind, req.model_dump(), settings.mongo_uri)
+        else:
+            crawler = build_crawler(kind, req)
+            job_id = get_job_manager().submit(kind, crawler, settings.mongo_uri).id
+    except QueueFullError as e:
+        logger.warning(f"Rejected {kind} crawl: {e}")
+        raise HTTPException(status_code=429, detail=str(e))
+    return CrawlResponse(success=True, message="Task accepted", job_id=job_id)
 
 
 @router.post("/mail/crawl", response_model=CrawlResponse, tags=["mail"])
-async def crawl_mail(req: MailCrawlRequest, tasks: BackgroundTasks):
-    settings = get_settings()
-    crawler = MailCrawler(
-        server=req.server,
-        port=req.port,
-        username=req.username,
-        password=req.password,
-        database=req.database,
-        collection=req.collection,
-        limit=req.limit,
-        use_ssl=req.use_ssl,
-    )
-    tasks.add_task(_execute_crawler, crawler, settings.mongo_uri, req.database)
-    return CrawlResponse(success=True, message="Task accepted")
+async def crawl_mail(req: MailCrawlRequest):
+    return await _submit("mail", req)
 
 
 @router.post("/rss/crawl", response_model=CrawlResponse, tags=["rss"])
-async def crawl_rss(req: RssCrawlRequest, tasks: BackgroundTasks):
+async def crawl_rss(req: RssCrawlRequest):
     logger.info(f"RSS crawl: {len(req.urls)} URLs, {req.database}/{req.collection}")
-    settings = get_settings()
-    crawler = RssCrawler(urls=req.urls, database=req.database, collection=req.collection)
-    tasks.add_task(_execute_crawler, crawler, settings.mongo_uri, req.database)
-    return CrawlResponse(success=True, message="Task accepted")
+    return await _submit("rss", req)
 
 
 @router.post("/mongo/crawl", response_model=CrawlResponse, tags=["mongo"])
-async def crawl_mongo(req: MongoCrawlRequest, tasks: BackgroundTasks):
+async def crawl_mongo(req: MongoCrawlRequest):
     logger.info(f"Mongo crawl: {req.source_database}/{req.source_collection} -> {req.target_database}/{req.target_collection}")
-    settings = get_settings()
-    crawler = MongoCrawler(
-        source_uri=req.source_uri,
-        source_database=req.source_database,
-        source_collection=req.source_collection,
-        target_database=req.target_database,
-        target_collection=req.target_collection,
-        limit=req.limit,
+    return await _submit("mongo", req)
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse, tags=["jobs"])
+async def get_job(job_id: str):
+    if get_settings().job_backend == "mongo":
+        job = await get_job_queue().get(job_id)
+    else:
+        job = get_job_manager().get(job_id)
+        job = job.to_dict() if job else None
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(**job)
+
+
+@router.post("/schedules", response_model=ScheduleResponse, tags=["schedules"])
+async def create_schedule(req: ScheduleRequest):
+    schedule = await get_scheduler().create(
+        kind=req.kind,
+        request=req.request,
+        interval_seconds=req.interval_seconds,
+        jitter_seconds=req.jitter_seconds,
+        enabled=req.enabled,
     )
-    tasks.add_task(_execute_crawler, crawler, settings.mongo_uri, req.target_database)
-    return CrawlResponse(success=True, message="Task accepted")
+    return _schedule_response(schedule)
+
+
+@router.get("/schedules", response_model=list[ScheduleResponse], tags=["schedules"])
+async def list_schedules():
+    return [_schedule_response(schedule) for schedule in await get_scheduler().schedules()]
+
+
+@router.delete("/schedules/{schedule_id}", response_model=CrawlResponse, tags=["schedules"])
+async def delete_schedule(schedule_id: str):
+    if not await get_scheduler().delete(schedule_id):
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return CrawlResponse(success=True, message="Schedule deleted")
@@ -1,6 +1,21 @@
-from typing import Optional
+from datetime import datetime
+from typing import Any, Literal, Optional
 
-from pydantic import BaseModel, Field
+from bson.errors import BSONError
+from pydantic import BaseModel, Field, model_validator
+
+from src.infrastructure.database import from_extended_json
+
+
+class MailAccountRequest(BaseModel):
+    server: str = Field(..., description="Mail server address")
+    port: int = Field(..., description="Mail server port")
+    username: str = Field(..., description="Email username")
+    password: str = Field(..., description="Email password")
+    use_ssl: bool = Field(True, description="Use SSL connection")
+    protocol: Optional[Literal["imap", "pop3"]] = Field(
+        None, description="Mail protocol, inferred from the server name when omitted"
+    )
 
 
 class MailCrawlRequest(BaseModel):
@@ -10,14 +25,29 @@ class MailCrawlRequest(BaseModel):
     password: str = Field(..., description="Email password")
     database: str = Field(..., description="Database name")
     collection: str = Field(..., description="Collection name")
-    limit: Optional[int] = Field(None, description="Limit number of emails")
+    limit: Optional[int] = Field(None, description="Limit number of emails per folder")
     use_ssl: bool = Field(True, description="Use SSL connection")
+    incremental: bool = Field(True, description="Only fetch mail that arrived since the last crawl")
+    headers_only: bool = Field(False, description="Fetch headers and size only, skipping bodies")
+    protocol: Optional[Literal["imap", "pop3"]] = Field(
+        None, description="Mail protocol, inferred from the server name when omitted"
+    )
+    store_attachments: bool = Field(False, description="Store attachments in GridFS, deduplicated by SHA-256")
+    folders: list[str] = Field(
+        ["INBOX"],
+        min_length=1,
+        description="IMAP folders to crawl; shell-style patterns such as 'Archive/*' match the server's folder list",
+    )
+    accounts: list[MailAccountRequest] = Field(
+        default_factory=list, description="Additional accounts crawled with the same options"
+    )
 
 
 class RssCrawlRequest(BaseModel):
     urls: list[str] = Field(..., description="RSS feed URLs")
     database: str = Field(..., description="Database name")
     collection: str = Field(..., description="Collection name")
+    use_cache: bool = Field(True, description="Skip feeds unchanged since the last crawl")
 
 
 class MongoCrawlRequest(BaseModel):
@@ -26,9 +56,149 @@ class MongoCrawlRequest(BaseModel):
     source_collection: str = Field(..., description="Source collection name")
     target_database: str = Field(..., description="Target database name")
     target_collection: str = Field(..., description="Target collection name")
-    limit: Optional[int] = Field(None, description="Limit number of documents")
+    limit: Optional[int] = Field(
+        None,
+        description="Copy only the newest N documents by _id; incremental sync copies at most N per run",
+    )
+    stream: bool = Field(False, description="Stream the copy in batches instead of loading it into memory")
+    batch_size: int = Field(1000, gt=0, description="Documents per batch in stream mode")
+    resume: bool = Field(True, description="Resume an interrupted stream copy from its checkpoint")
+    partitions: int = Field(
+        1, ge=1, le=64, description="Copy the source _id space as this many ranges in parallel"
+    )
+    sync: Optional[Literal["incremental", "tail"]] = Field(
+        None,
+        description="incremental copies documents past the stored high-water mark; "
+        "tail follows the source change stream (replica sets only)",
+    )
+    sync_field: str = Field("_id", description="Monotonic field used as the incremental high-water mark")
+    tail_seconds: Optional[float] = Field(
+        None, gt=0, description="Stop tailing after this many seconds, otherwise tail until cancelled"
+    )
+    filter: Optional[dict[str, Any]] = Field(
+        None, description="Query filter run on the source, in MongoDB Extended JSON"
+    )
+    projection: Optional[dict[str, Any]] = Field(None, description="Fields to read from the source")
+    sort: Optional[list[tuple[str, Literal[1, -1]]]] = Field(
+        None, description="Sort keys for a plain copy, e.g. [[\"updated_at\", -1]]"
+    )
+    hint: Optional[str | list[tuple[str, Literal[1, -1]]]] = Field(
+        None, description="Index name or key pattern the source query should use"
+    )
+    pipeline: Optional[list[dict[str, Any]]] = Field(
+        None, description="Aggregation pipeline run on the source instead of a find, for a plain copy"
+    )
+    raw: bool = Field(
+        False,
+        description="Forward raw BSON to the target with replaces, without decoding documents "
+        "or tracking content hashes and timestamps",
+    )
+
+    @model_validator(mode="after")
+    def _validate_modes(self) -> "MongoCrawlRequest":
+        if self.partitions > 1 and self.limit:
+            raise ValueError("limit cannot be combined with a partitioned copy")
+        if self.partitions > 1 and self.sync:
+            raise ValueError("sync modes cannot be combined with a partitioned copy")
+        if self.raw and self.sync == "tail":
+            raise ValueError("raw copies cannot be combined with tailing")
+        plain = not (self.stream or self.sync or self.partitions > 1 or self.raw)
+        if (self.sort or self.pipeline) and not plain:
+            raise ValueError("sort and pipeline only apply to a plain copy")
+        if self.pipeline and (self.filter or self.projection or self.sort):
+            raise ValueError("put filter, projection and sort stages inside the pipeline")
+        if self.sync == "tail" and (self.filter or self.projection):
+            raise ValueError("filter and projection cannot be combined with tailing")
+        if self.projection and self.projection.get("_id") in (0, False):
+            raise ValueError("projection must keep _id")
+        if self.sync == "incremental" and not _projection_keeps(self.projection, self.sync_field):
+            raise ValueError("projection must keep sync_field for an incremental sync")
+        for stage in self.pipeline or []:
+            if len(stage) != 1 or not next(iter(stage)).startswith("$"):
+                raise ValueError(f"Invalid pipeline stage: {stage}")
+        _reject_operators([self.filter, self.pipeline], FORBIDDEN_SOURCE_OPERATORS)
+        try:
+            from_extended_json([self.filter, self.projection, self.pipeline])
+        except (BSONError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid Extended JSON: {e}")
+        return self
+
+
+FORBIDDEN_SOURCE_OPERATORS = {"$where", "$function", "$accumulator", "$out", "$merge"}
+
+
+def _projection_keeps(projection: Optional[dict[str, Any]], field: str) -> bool:
+    if not projection or field == "_id":
+        return True
+    parts = field.split(".")
+    paths = [".".join(parts[: i + 1]) for i in range(len(parts))]
+    inclusive = any(value not in (0, False) for key, value in projection.items() if key != "_id")
+    if inclusive:
+        return any(projection.get(path) not in (None, 0, False) for path in paths)
+    return all(projection.get(path) not in (0, False) for path in paths)
+
+
+def _reject_operators(value: Any, forbidden: set[str]) -> None:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in forbidden:
+                raise ValueError(f"{key} is not allowed in source queries")
+            _reject_operators(item, forbidden)
+    elif isinstance(value, list):
+        for item in value:
+            _reject_operators(item, forbidden)
+
+
+CRAWL_REQUEST_MODELS: dict[str, type[BaseModel]] = {
+    "mail": MailCrawlRequest,
+    "rss": RssCrawlRequest,
+    "mongo": MongoCrawlRequest,
+}
 
 
 class CrawlResponse(BaseModel):
     success: bool
     message: str
+    job_id: Optional[str] = None
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    state: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    fetched: int
+    saved: int
+    errors: int
+    queued: int
+    throughput: float = Field(..., description="Items saved per second")
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: Optional[int] = Field(None, description="Delivery attempts, for jobs on the shared queue")
+
+
+class ScheduleRequest(BaseModel):
+    kind: Literal["mail", "rss", "mongo"] = Field(..., description="Crawler type")
+    request: dict[str, Any] = Field(..., description="Crawl request body for the crawler type")
+    interval_seconds: int = Field(..., ge=60, description="Seconds between runs")
+    jitter_seconds: int = Field(0, ge=0, description="Random delay added to each run")
+    enabled: bool = Field(True, description="Whether the schedule is active")
+
+    @model_validator(mode="after")
+    def _validate_request(self) -> "ScheduleRequest":
+        model = CRAWL_REQUEST_MODELS[self.kind]
+        self.request = model.model_validate(self.request).model_dump()
+        return self
+
+
+class ScheduleResponse(BaseModel):
+    id: str
+    kind: str
+    interval_seconds: int
+    jitter_seconds: int
+    enabled: bool
+    next_run_at: datetime
+    last_run_at: Optional[datetime] = None
+    last_job_id: Optional[str] = None
@@ -1,10 +1,18 @@
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from src.api.routes import router
 from src.config.settings import get_settings
+from src.infrastructure.database import close_mongo_clients, get_mongo_clients
+from src.infrastructure.executor import get_executor, shutdown_executor
+from src.infrastructure.metrics import get_metrics
+from src.jobs.manager import get_job_manager, stop_job_manager
+from src.jobs.queue import get_job_queue, stop_job_queue
+from src.jobs.scheduler import get_scheduler, stop_scheduler
 
 
 def create_app() -> FastAPI:
@@ -15,6 +23,7 @@ def create_app() -> FastAPI:
         title=settings.app_title,
         version=settings.app_version,
         description="Crawler service for collecting information",
+        lifespan=_lifespan,
     )
 
     _add_middleware(app)
@@ -23,6 +32,25 @@ def create_app() -> FastAPI:
     return app
 
 
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    get_executor()
+    get_mongo_clients()
+    get_job_manager().start()
+    if get_settings().job_backend == "mongo":
+        await get_job_queue().start()
+    if get_settings().scheduler_enabled:
+        get_scheduler().start()
+    try:
+        yield
+    finally:
+        await stop_scheduler()
+        await stop_job_queue()
+        await stop_job_manager()
+        close_mongo_clients()
+        shutdown_executor()
+
+
 def _configure_logging(level: str) -> None:
     logging.basicConfig(
         level=level,
@@ -52,5 +80,11 @@ def _add_routes(app: FastAPI) -> None:
             "status": "running",
         }
 
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        return PlainTextResponse(
+            get_metrics().render(), media_type="text/plain; version=0.0.4"
+        )
+
 
 app = create_app()
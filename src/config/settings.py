@@ -8,6 +8,57 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     app_title: str = "Crawler Service"
     app_version: str = "0.1.0"
+    io_workers: int = 32
+    cpu_workers: int = 4
+    parse_workers: int = 2
+    mongo_max_pool_size: int = 100
+    mongo_min_pool_size: int = 0
+    mongo_max_idle_time_ms: int = 300000
+    mongo_max_connecting: int = 2
+    mongo_source_max_idle_clients: int = 4
+    mongo_source_idle_seconds: float = 300
+    http_timeout: float = 30
+    http_connect_timeout: float = 10
+    http_min_timeout: float = 2
+    http_timeout_multiplier: float = 4
+    http_retries: int = 2
+    http_retry_base_seconds: float = 0.5
+    http_retry_max_seconds: float = 10
+    http_retry_budget_ratio: float = 0.2
+    http_breaker_failures: int = 3
+    http_breaker_cooldown_seconds: float = 300
+    http_breaker_max_cooldown_seconds: float = 3600
+    http_max_connections: int = 100
+    http_max_per_host: int = 4
+    http2: bool = False
+    mail_fetch_chunk_size: int = 200
+    mail_max_part_bytes: int = 1024 * 1024
+    mail_max_body_bytes: int = 4 * 1024 * 1024
+    mail_attachment_bucket: str = "mail_attachments"
+    mail_max_connections: int = 8
+    mail_max_per_server: int = 4
+    job_workers: int = 8
+    job_queue_size: int = 100
+    job_limit_mail: int = 4
+    job_limit_rss: int = 4
+    job_limit_mongo: int = 2
+    job_history: int = 1000
+    job_backend: str = "memory"
+    job_lease_seconds: float = 120
+    job_heartbeat_seconds: float = 30
+    job_poll_seconds: float = 2
+    job_max_attempts: int = 3
+    job_retry_base_seconds: float = 30
+    job_retry_max_seconds: float = 900
+    scheduler_enabled: bool = False
+    scheduler_database: str = "crawler_service"
+    scheduler_tick_seconds: float = 5
+    scheduler_host_gap_seconds: float = 30
+    stream_queue_size: int = 1000
+    write_batch_size: int = 1000
+    write_batch_window_seconds: float = 0.05
+    write_batch_bytes: int = 8 * 1024 * 1024
+    write_max_in_flight: int = 4
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,9 +1,44 @@
+import asyncio
+import inspect
+import threading
 from abc import ABC, abstractmethod
 from datetime import datetime, timezone
-from typing import Any
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional
 
-from src.infrastructure.database import Database
+from pymongo import UpdateOne
+
+from src.config.settings import get_settings
+from src.domain.models import CrawlProgress
+from src.infrastructure.database import (
+    BatchResult,
+    BulkWriter,
+    BulkWriteStats,
+    CRAWL_FIELD,
+    Database,
+    crawl_content,
+    fingerprint,
+)
+from src.infrastructure.executor import Executor, get_executor
 from src.infrastructure.logger import setup_logger
+from src.infrastructure.metrics import (
+    BYTES_OUT,
+    ITEMS,
+    QUEUE_DEPTH,
+    STAGE_SECONDS,
+    HistogramChild,
+)
+
+
+CrawlResult = (
+    list[dict[str, Any]]
+    | Awaitable[list[dict[str, Any]]]
+    | Iterable[dict[str, Any]]
+    | AsyncIterator[dict[str, Any]]
+)
+
+DONE = object()
+WINDOW_ELAPSED = object()
 
 
 class Crawler(ABC):
@@ -11,6 +46,8 @@ class Crawler(ABC):
         self._database = database
         self._collection = collection
         self._logger = setup_logger(self.__class__.__name__)
+        self._name = self.__class__.__name__
+        self.progress = CrawlProgress()
 
     @property
     def database(self) -> str:
@@ -20,26 +57,167 @@ class Crawler(ABC):
     def collection(self) -> str:
         return self._collection
 
+    @property
+    def executor(self) -> Executor:
+        return get_executor()
+
+    def _stage(self, name: str) -> HistogramChild:
+        return STAGE_SECONDS.labels(self._name, name)
+
     @abstractmethod
-    def crawl(self) -> list[dict[str, Any]]:
+    def crawl(self) -> CrawlResult:
         pass
 
     async def execute(self, db: Database) -> dict[str, Any]:
-        items = self.crawl()
-        
-        if not items:
+        self.progress = CrawlProgress()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=get_settings().stream_queue_size)
+        stopped = threading.Event()
+        producer = asyncio.create_task(self._produce(queue, stopped))
+        writer = db.bulk_writer(self._collection, on_batch=self._record_batch)
+        settings = get_settings()
+        batch_size = settings.write_batch_size
+        window = settings.write_batch_window_seconds
+        loop = asyncio.get_running_loop()
+        pending: list[dict[str, Any]] = []
+        deadline: Optional[float] = None
+        depth = QUEUE_DEPTH.labels(self._name)
+        try:
+            async with writer:
+                while (item := await self._next_item(queue, deadline)) is not DONE:
+                    if item is not WINDOW_ELAPSED:
+                        self.progress.queued = queue.qsize()
+                        depth.set(self.progress.queued)
+                        pending.append(item)
+                        deadline = deadline or loop.time() + window
+                    if len(pending) >= batch_size or item is WINDOW_ELAPSED:
+                        await self._write(pending, writer)
+                        pending = []
+                        deadline = None
+                if pending:
+                    await self._write(pending, writer)
+            await producer
+        finally:
+            stopped.set()
+            producer.cancel()
+            self._drain(queue)
+            depth.set(0)
+
+        total = self.progress.fetched
+        if not total:
             self._logger.warning("No data fetched")
             return {"success": True, "message": "No data", "total": 0}
-        
-        self._logger.info(f"Fetched {len(items)} items")
-        await self._save(items, db)
-        self._logger.info(f"Saved {len(items)} items")
-        return {"success": True, "message": "Completed", "total": len(items)}
-
-    async def _save(self, items: list[dict[str, Any]], db: Database) -> None:
-        for item in items:
-            item["created_at"] = self._now()
-            await db.upsert(self._collection, {"_id": item["_id"]}, item)
+
+        stats = writer.stats
+        self._logger.info(
+            f"Saved {total} items in {len(stats.batches)} batches: "
+            f"inserted={stats.upserted}, updated={stats.modified}, "
+            f"unchanged={stats.unchanged}, errors={stats.errors}"
+        )
+        return self._result(total, stats)
+
+    async def _produce(self, queue: asyncio.Queue, stopped: threading.Event) -> None:
+        try:
+            if inspect.isasyncgenfunction(self.crawl):
+                async for item in self.crawl():
+                    await self._enqueue(queue, item)
+            elif inspect.iscoroutinefunction(self.crawl):
+                for item in await self.crawl():
+                    await self._enqueue(queue, item)
+            else:
+                await self._pump(self.crawl, partial(self._enqueue, queue), stopped)
+        finally:
+            await queue.put(DONE)
+
+    async def _enqueue(self, queue: asyncio.Queue, item: dict[str, Any]) -> None:
+        await queue.put(item)
+        self.progress.fetched += 1
+        ITEMS.labels(self._name, "fetched").inc()
+
+    async def _pump(
+        self,
+        items: Callable[[], Iterable[Any]],
+        put: Callable[[Any], Awaitable[None]],
+        stopped: threading.Event,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        await self.executor.run_io(self._pump_items, items, put, loop, stopped)
+
+    @staticmethod
+    def _pump_items(
+        items: Callable[[], Iterable[Any]],
+        put: Callable[[Any], Awaitable[None]],
+        loop: asyncio.AbstractEventLoop,
+        stopped: threading.Event,
+    ) -> None:
+        for item in items():
+            if stopped.is_set():
+                return
+            asyncio.run_coroutine_threadsafe(put(item), loop).result()
+
+    @staticmethod
+    async def _next_item(queue: asyncio.Queue, deadline: Optional[float]) -> Any:
+        if deadline is None:
+            return await queue.get()
+        remaining = deadline - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            return WINDOW_ELAPSED
+        if not queue.empty():
+            return queue.get_nowait()
+        try:
+            return await asyncio.wait_for(queue.get(), remaining)
+        except asyncio.TimeoutError:
+            return WINDOW_ELAPSED
+
+    @staticmethod
+    def _drain(queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            queue.get_nowait()
+
+    def _record_batch(self, batch: BatchResult) -> None:
+        self.progress.saved += batch.size - batch.errors
+        self.progress.errors += batch.errors
+        self._stage("save").observe(batch.seconds)
+        BYTES_OUT.labels(self._name).inc(batch.bytes)
+        ITEMS.labels(self._name, "saved").inc(batch.size - batch.errors)
+        if batch.errors:
+            ITEMS.labels(self._name, "errors").inc(batch.errors)
+
+    async def _write(self, items: list[dict[str, Any]], writer: BulkWriter) -> None:
+        now = self._now()
+        contents = [crawl_content(item) for item in items]
+        fingerprints = [fingerprint(content) for content in contents]
+        stored = await writer.stored_hashes([item["_id"] for item in items])
+        for item, content, (digest, size) in zip(items, contents, fingerprints):
+            if stored.get(item["_id"]) == digest:
+                self._skip_unchanged(writer)
+                continue
+            op = UpdateOne(
+                {"_id": item["_id"]},
+                {
+                    "$set": {
+                        **content,
+                        f"{CRAWL_FIELD}.hash": digest,
+                        f"{CRAWL_FIELD}.updated_at": now,
+                    },
+                    "$setOnInsert": {f"{CRAWL_FIELD}.created_at": now},
+                },
+                upsert=True,
+            )
+            await writer.add(op, size)
+
+    def _skip_unchanged(self, writer: BulkWriter) -> None:
+        writer.skip()
+        self.progress.saved += 1
+        ITEMS.labels(self._name, "unchanged").inc()
+
+    @staticmethod
+    def _result(total: int, stats: BulkWriteStats) -> dict[str, Any]:
+        return {
+            "success": stats.errors == 0,
+            "message": "Completed" if not stats.errors else "Completed with errors",
+            "total": total,
+            **stats.to_dict(),
+        }
 
     @staticmethod
     def _now() -> str:
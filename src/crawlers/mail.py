@@ -1,13 +1,34 @@
-import email
+import asyncio
+import binascii
+import codecs
+import fnmatch
 import imaplib
 import poplib
+import re
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from email.header import decode_header
 from email.message import Message
+from email.parser import BytesHeaderParser
 from email.utils import parseaddr, parsedate_to_datetime
-from typing import Optional, Protocol
+from functools import lru_cache, partial
+from typing import Any, AsyncIterator, Iterator, Optional, Protocol
 
-from src.crawlers.base import Crawler
-from src.domain.models import Email as EmailModel
+from src.config.settings import get_settings
+from src.crawlers.base import DONE, Crawler
+from src.domain.models import Attachment, Email as EmailModel
+from src.infrastructure.attachments import AttachmentStore
+from src.infrastructure.database import Database
+from src.infrastructure.logger import setup_logger
+from src.infrastructure.metrics import BYTES_IN, MAIL_SECONDS, HistogramChild
+
+
+logger = setup_logger(__name__)
 
 
 class MailProtocol(Protocol):
@@ -18,19 +39,46 @@ class MailProtocol(Protocol):
 
 class TextDecoder:
     _fallbacks = ["utf-8", "gbk", "gb2312"]
+    _ascii_probe = bytes(range(128)) + b"\x1b$B\x1b(B\x1b$)C\x0e\x0f+AGE-~{~}"
 
     @classmethod
-    def decode(cls, content: bytes, charset: Optional[str]) -> str:
-        for encoding in ([charset] if charset else []) + cls._fallbacks:
+    def decode(cls, content: bytes, charset: Optional[str], strict: bool = True) -> str:
+        encodings = cls._candidates(charset)
+        if content.isascii() and cls._ascii_compatible(encodings[0]):
+            return content.decode("ascii")
+        if not strict:
+            return content.decode(encodings[0], errors="ignore")
+        for encoding in encodings:
             if decoded := cls._try_decode(content, encoding):
                 return decoded
         return content.decode("utf-8", errors="ignore")
 
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _candidates(cls, charset: Optional[str]) -> tuple[str, ...]:
+        encodings = []
+        for name in ([charset] if charset else []) + cls._fallbacks:
+            try:
+                codec = codecs.lookup(name).name
+            except LookupError:
+                continue
+            if codec not in encodings:
+                encodings.append(codec)
+        return tuple(encodings)
+
+    @classmethod
+    @lru_cache(maxsize=64)
+    def _ascii_compatible(cls, encoding: str) -> bool:
+        try:
+            return cls._ascii_probe.decode(encoding) == cls._ascii_probe.decode("ascii")
+        except UnicodeDecodeError:
+            return False
+
     @staticmethod
     def _try_decode(content: bytes, encoding: str) -> Optional[str]:
         try:
             return content.decode(encoding)
-        except (UnicodeDecodeError, LookupError):
+        except UnicodeDecodeError:
             return None
 
     @classmethod
@@ -46,27 +94,52 @@ class TextDecoder:
         return "".join(parts)
 
 
+@dataclass
+class AttachmentSpan:
+    start: int
+    end: int
+    encoding: str
+
+
 class MessageParser:
-    def __init__(self):
+    _body_types = {"text/plain": "text_body", "text/html": "html_body"}
+    _blank_line = re.compile(rb"\r?\n\r?\n")
+    _max_depth = 20
+
+    def __init__(self, max_part_bytes: int, max_body_bytes: int):
         self._decoder = TextDecoder()
+        self._header_parser = BytesHeaderParser()
+        self._max_part_bytes = max_part_bytes
+        self._max_body_bytes = max_body_bytes
 
     def parse(self, raw: bytes) -> Optional[EmailModel]:
+        return self.parse_with_spans(raw)[0]
+
+    def parse_with_spans(
+        self, raw: bytes
+    ) -> tuple[Optional[EmailModel], list[AttachmentSpan]]:
         try:
-            msg = email.message_from_bytes(raw)
-            return self._build_email(msg)
+            msg, body_start = self._split_headers(raw, 0, len(raw))
+            return self._build_email(raw, msg, body_start)
         except Exception:
-            return None
+            return None, []
 
-    def _build_email(self, msg: Message) -> EmailModel:
-        return EmailModel(
+    def _build_email(
+        self, raw: bytes, msg: Message, body_start: int
+    ) -> tuple[EmailModel, list[AttachmentSpan]]:
+        bodies, attachments, spans, truncated = self._extract(raw, msg, body_start)
+        email_obj = EmailModel(
             message_id=msg.get("Message-ID", ""),
             subject=self._decoder.decode_header_text(msg.get("Subject", "")),
             from_addr=self._parse_address(msg.get("From", "")),
             to_addr=self._parse_address(msg.get("To", "")),
             date=self._parse_date(msg.get("Date", "")),
-            text_body=self._extract_body(msg, "text/plain"),
-            html_body=self._extract_body(msg, "text/html"),
+            text_body="\n".join(bodies["text_body"]),
+            html_body="\n".join(bodies["html_body"]),
+            attachments=attachments,
+            truncated=truncated,
         )
+        return email_obj, spans
 
     @staticmethod
     def _parse_address(addr: str) -> str:
@@ -81,40 +154,244 @@ class MessageParser:
         except Exception:
             return date_str
 
-    def _extract_body(self, msg: Message, content_type: str) -> str:
+    def _split_headers(self, raw: bytes, start: int, end: int) -> tuple[Message, int]:
+        for blank in (b"\r\n", b"\n"):
+            if raw.startswith(blank, start, end):
+                return self._header_parser.parsebytes(b""), start + len(blank)
+        if not (match := self._blank_line.search(raw, start, end)):
+            return self._header_parser.parsebytes(raw[start:end]), end
+        return self._header_parser.parsebytes(raw[start : match.start()]), match.end()
+
+    def _walk(
+        self, raw: bytes, headers: Message, start: int, end: int, depth: int = 0
+    ) -> Iterator[tuple[Message, int, int]]:
+        if depth < self._max_depth:
+            if headers.get_content_maintype() == "multipart":
+                parts = self._split_parts(raw, start, end, headers.get_boundary())
+                if parts is not None:
+                    for part_start, part_end in parts:
+                        part, body_start = self._split_headers(raw, part_start, part_end)
+                        yield from self._walk(raw, part, body_start, part_end, depth + 1)
+                    return
+            elif headers.get_content_type() == "message/rfc822":
+                inner, body_start = self._split_headers(raw, start, end)
+                yield from self._walk(raw, inner, body_start, end, depth + 1)
+                return
+        yield headers, start, end
+
+    @classmethod
+    def _split_parts(
+        cls, raw: bytes, start: int, end: int, boundary: Optional[str]
+    ) -> Optional[list[tuple[int, int]]]:
+        if not boundary:
+            return None
+        marker = b"--" + boundary.encode("utf-8", "surrogateescape")
+        starts = []
+        index = raw.find(marker, start, end)
+        while index != -1:
+            at_line_start = index == start or raw[index - 1] == 0x0A
+            if at_line_start and cls._is_delimiter(raw, index + len(marker), end):
+                starts.append(index)
+            index = raw.find(marker, index + len(marker), end)
+        if not starts:
+            return None
         parts = []
-        for part in msg.walk() if msg.is_multipart() else [msg]:
-            if part.get_content_type() == content_type:
-                parts.append(self._decode_part(part))
-        return "\n".join(filter(None, parts))
+        for current, following in zip(starts, starts[1:] + [end]):
+            if raw.startswith(b"--", current + len(marker), end):
+                break
+            line_end = raw.find(b"\n", current, following)
+            if line_end == -1:
+                continue
+            part_end = following
+            if following < end:
+                part_end -= 2 if raw[following - 2 : following] == b"\r\n" else 1
+            parts.append((line_end + 1, max(line_end + 1, part_end)))
+        return parts
+
+    @staticmethod
+    def _is_delimiter(raw: bytes, index: int, end: int) -> bool:
+        if raw.startswith(b"--", index, end):
+            index += 2
+        line_end = raw.find(b"\n", index, end)
+        tail = raw[index : end if line_end == -1 else line_end]
+        return not tail.rstrip(b"\r").strip(b" \t")
 
-    def _decode_part(self, part: Message) -> str:
+    def _extract(
+        self, raw: bytes, msg: Message, body_start: int
+    ) -> tuple[dict[str, list[str]], list[Attachment], list[AttachmentSpan], bool]:
+        bodies: dict[str, list[str]] = {"text_body": [], "html_body": []}
+        attachments, spans = [], []
+        remaining = self._max_body_bytes
+        truncated = False
+        for headers, start, end in self._walk(raw, msg, body_start, len(raw)):
+            field_name = self._body_types.get(headers.get_content_type())
+            if not field_name or headers.get_content_disposition() == "attachment":
+                span = AttachmentSpan(start, end, _transfer_encoding(headers))
+                attachments.append(self._describe(headers, raw, span))
+                spans.append(span)
+                continue
+            if remaining <= 0:
+                truncated = True
+                continue
+            limit = min(self._max_part_bytes, remaining)
+            text, size, clipped = self._decode_part(headers, raw, start, end, limit)
+            remaining -= size
+            truncated = truncated or clipped
+            if text:
+                bodies[field_name].append(text)
+        return bodies, attachments, spans, truncated
+
+    def _describe(self, headers: Message, raw: bytes, span: AttachmentSpan) -> Attachment:
+        return Attachment(
+            filename=self._decoder.decode_header_text(headers.get_filename() or ""),
+            content_type=headers.get_content_type(),
+            size=self._decoded_size(raw, span),
+            inline=headers.get_content_disposition() == "inline",
+            content_id=(headers.get("Content-ID") or "").strip("<> "),
+        )
+
+    @staticmethod
+    def _decoded_size(raw: bytes, span: AttachmentSpan) -> int:
+        length = span.end - span.start
+        if span.encoding != "base64":
+            return length
+        compact = length - raw.count(b"\n", span.start, span.end) - raw.count(
+            b"\r", span.start, span.end
+        )
+        padding = raw[max(span.start, span.end - 4) : span.end].rstrip().count(b"=")
+        return max(0, compact * 3 // 4 - padding)
+
+    def _decode_part(
+        self, headers: Message, raw: bytes, start: int, end: int, limit: int
+    ) -> tuple[str, int, bool]:
         try:
-            payload = part.get_payload(decode=True)
-            if not payload:
-                return ""
-            charset = part.get_content_charset() or "utf-8"
-            return self._decoder.decode(payload, charset)
+            data, clipped = self._decode_payload(headers, raw, start, end, limit)
+            if not data:
+                return "", 0, clipped
+            charset = headers.get_content_charset() or "utf-8"
+            return self._decoder.decode(data, charset, strict=not clipped), len(data), clipped
         except Exception:
-            return ""
+            return "", 0, False
+
+    @staticmethod
+    def _decode_payload(
+        headers: Message, raw: bytes, start: int, end: int, limit: int
+    ) -> tuple[bytes, bool]:
+        budget = limit * 3 + 1024
+        clipped = end - start > budget
+        encoded = raw[start : min(end, start + budget)]
+        encoding = _transfer_encoding(headers)
+        if encoding == "base64":
+            compact = b"".join(encoded.split())
+            try:
+                data = binascii.a2b_base64(compact)
+            except binascii.Error:
+                data = binascii.a2b_base64(compact + b"=" * (-len(compact) % 4))
+        elif encoding == "quoted-printable":
+            data = binascii.a2b_qp(encoded)
+        else:
+            data = encoded
+        if len(data) > limit:
+            return data[:limit], True
+        return data, clipped
+
+
+def _transfer_encoding(headers: Message) -> str:
+    return str(headers.get("Content-Transfer-Encoding", "")).strip().lower()
+
+
+def iter_attachment(
+    raw: bytes, span: AttachmentSpan, chunk_size: int = 256 * 1024
+) -> Iterator[bytes]:
+    view = memoryview(raw)[span.start : span.end]
+    if span.encoding not in ("base64", "quoted-printable"):
+        for offset in range(0, len(view), chunk_size):
+            yield bytes(view[offset : offset + chunk_size])
+        return
+    pending = b""
+    for offset in range(0, len(view), chunk_size):
+        encoded = pending + bytes(view[offset : offset + chunk_size])
+        if span.encoding == "base64":
+            compact = b"".join(encoded.split())
+            cut = len(compact) // 4 * 4
+            pending = compact[cut:]
+            yield binascii.a2b_base64(compact[:cut])
+        else:
+            cut = encoded.rfind(b"\n") + 1
+            pending = encoded[cut:]
+            yield binascii.a2b_qp(encoded[:cut])
+    if pending:
+        yield (
+            binascii.a2b_base64(pending + b"=" * (-len(pending) % 4))
+            if span.encoding == "base64"
+            else binascii.a2b_qp(pending)
+        )
+
+
+@lru_cache
+def get_message_parser() -> MessageParser:
+    settings = get_settings()
+    return MessageParser(settings.mail_max_part_bytes, settings.mail_max_body_bytes)
+
+
+def parse_messages(
+    raws: list[bytes], with_spans: bool = False
+) -> tuple[list[Optional[dict]], list[float]]:
+    results, durations = [], []
+    for raw in raws:
+        start = time.perf_counter()
+        email_obj, spans = get_message_parser().parse_with_spans(raw)
+        data = email_obj.to_dict() if email_obj else None
+        if data and with_spans:
+            data["_spans"] = spans
+        results.append(data)
+        durations.append(time.perf_counter() - start)
+    return results, durations
 
 
 class MailConnection:
+    _uid_pattern = re.compile(rb"UID (\d+)")
+    _size_pattern = re.compile(rb"RFC822\.SIZE (\d+)")
+    _list_pattern = re.compile(rb'\(([^)]*)\) (?:"(?:[^"\\]|\\.)*"|NIL) (.*)$', re.IGNORECASE)
+
     def __init__(
-        self, server: str, port: int, username: str, password: str, use_ssl: bool
+        self,
+        server: str,
+        port: int,
+        username: str,
+        password: str,
+        use_ssl: bool,
+        protocol: Optional[str] = None,
+        folder: str = "INBOX",
     ):
         self._server = server
         self._port = port
         self._username = username
         self._password = password
         self._use_ssl = use_ssl
-        self._is_imap = "imap" in server.lower()
+        self._is_imap = protocol == "imap" if protocol else "imap" in server.lower()
+        self._folder = folder if self._is_imap else "INBOX"
         self._conn: Optional[MailProtocol] = None
         self.total = 0
+        self.uidvalidity: Optional[int] = None
+        self._pipelining = False
+
+    @property
+    def is_imap(self) -> bool:
+        return self._is_imap
+
+    @property
+    def protocol(self) -> str:
+        return "imap" if self._is_imap else "pop3"
+
+    @property
+    def mailbox(self) -> str:
+        return f"{self._server}:{self._username}:{self._folder}"
 
     def connect(self) -> bool:
         try:
-            self._establish()
+            with self._round_trip("connect").time():
+                self._establish()
             return True
         except Exception:
             return False
@@ -129,8 +406,14 @@ class MailConnection:
         cls = imaplib.IMAP4_SSL if self._use_ssl else imaplib.IMAP4
         self._conn = cls(self._server, self._port)
         self._conn.login(self._username, self._password)
-        _, data = self._conn.select("INBOX")
+        _, data = self._conn.select(self._quote(self._folder))
         self.total = int(data[0])
+        _, validity = self._conn.response("UIDVALIDITY")
+        self.uidvalidity = int(validity[0]) if validity and validity[0] else None
+
+    @staticmethod
+    def _quote(folder: str) -> str:
+        return '"' + folder.replace("\\", "\\\\").replace('"', '\\"') + '"'
 
     def _connect_pop(self) -> None:
         cls = poplib.POP3_SSL if self._use_ssl else poplib.POP3
@@ -138,6 +421,13 @@ class MailConnection:
         self._conn.user(self._username)
         self._conn.pass_(self._password)
         self.total, _ = self._conn.stat()
+        self._pipelining = "PIPELINING" in self._pop_capabilities()
+
+    def _pop_capabilities(self) -> dict[str, list[str]]:
+        try:
+            return self._conn.capa()
+        except poplib.error_proto:
+            return {}
 
     def disconnect(self) -> None:
         if not self._conn:
@@ -151,56 +441,413 @@ class MailConnection:
         except Exception:
             pass
 
-    def fetch(self, msg_id: bytes) -> Optional[bytes]:
+    def list_folders(self) -> list[str]:
+        with self._round_trip("list").time():
+            _, data = self._conn.list()
+        return [name for name in map(self._folder_name, data) if name is not None]
+
+    @classmethod
+    def _folder_name(cls, item: bytes | tuple[bytes, bytes]) -> Optional[str]:
+        line, literal = item if isinstance(item, tuple) else (item, None)
+        match = cls._list_pattern.match(line or b"")
+        if not match or b"\\noselect" in match.group(1).lower():
+            return None
+        name = literal if literal is not None else match.group(2)
+        if name.startswith(b'"') and name.endswith(b'"'):
+            name = re.sub(rb"\\(.)", rb"\1", name[1:-1])
+        return name.decode("utf-8", errors="replace")
+
+    def search_uids(self, after: int = 0) -> list[int]:
+        with self._round_trip("search").time():
+            _, data = self._conn.uid("SEARCH", None, f"UID {after + 1}:*")
+        return [uid for uid in map(int, data[0].split()) if uid > after]
+
+    def list_uidl(self) -> dict[str, int]:
+        with self._round_trip("uidl").time():
+            _, lines, _ = self._conn.uidl()
+        return {
+            uid.decode(): int(num) for num, uid in (line.split()[:2] for line in lines)
+        }
+
+    def fetch_many(
+        self, msg_ids: list[int], headers_only: bool = False
+    ) -> dict[int, tuple[bytes, int]]:
         try:
-            if self._is_imap:
-                _, data = self._conn.fetch(msg_id, "(RFC822)")
-                return data[0][1]
-            _, lines, _ = self._conn.retr(int(msg_id))
-            return b"\r\n".join(lines)
+            with self._round_trip("fetch").time():
+                if self._is_imap:
+                    return self._fetch_imap(msg_ids, headers_only)
+                return self._fetch_pop(msg_ids, headers_only)
         except Exception:
-            return None
+            return {}
+
+    def _round_trip(self, command: str) -> HistogramChild:
+        return MAIL_SECONDS.labels(self.protocol, command)
+
+    def _fetch_imap(
+        self, uids: list[int], headers_only: bool
+    ) -> dict[int, tuple[bytes, int]]:
+        items = "(BODY.PEEK[HEADER] RFC822.SIZE)" if headers_only else "(RFC822)"
+        _, data = self._conn.uid("FETCH", self._message_set(uids), items)
+        results = {}
+        for i, item in enumerate(data):
+            if not isinstance(item, tuple):
+                continue
+            trailer = data[i + 1] if i + 1 < len(data) else b""
+            meta = item[0] + (trailer if isinstance(trailer, bytes) else b"")
+            if uid := self._uid_pattern.search(meta):
+                size = self._size_pattern.search(meta)
+                results[int(uid.group(1))] = (
+                    item[1],
+                    int(size.group(1)) if size else len(item[1]),
+                )
+        return results
+
+    @staticmethod
+    def _message_set(uids: list[int]) -> str:
+        ranges: list[list[int]] = []
+        for uid in sorted(uids):
+            if ranges and uid == ranges[-1][1] + 1:
+                ranges[-1][1] = uid
+            else:
+                ranges.append([uid, uid])
+        return ",".join(
+            str(start) if start == end else f"{start}:{end}" for start, end in ranges
+        )
+
+    def _fetch_pop(
+        self, numbers: list[int], headers_only: bool
+    ) -> dict[int, tuple[bytes, int]]:
+        command = "TOP {} 0" if headers_only else "RETR {}"
+        sizes = self._pop_sizes() if headers_only else {}
+        if self._pipelining:
+            for num in numbers:
+                self._conn._putcmd(command.format(num))
+        results = {}
+        for num in numbers:
+            try:
+                if not self._pipelining:
+                    self._conn._putcmd(command.format(num))
+                _, lines, _ = self._conn._getlongresp()
+            except poplib.error_proto:
+                continue
+            raw = b"\r\n".join(lines)
+            results[num] = (raw, sizes.get(num, len(raw)))
+        return results
+
+    def _pop_sizes(self) -> dict[int, int]:
+        _, lines, _ = self._conn.list()
+        return {int(num): int(size) for num, size in (line.split()[:2] for line in lines)}
+
+
+@dataclass(frozen=True)
+class MailAccount:
+    server: str
+    port: int
+    username: str
+    password: str
+    use_ssl: bool = True
+    protocol: Optional[str] = None
+
+    def connection(self, folder: str = "INBOX") -> MailConnection:
+        return MailConnection(
+            self.server,
+            self.port,
+            self.username,
+            self.password,
+            self.use_ssl,
+            self.protocol,
+            folder,
+        )
+
+
+def match_folders(specs: list[str], available: list[str]) -> list[str]:
+    folders: list[str] = []
+    for spec in specs:
+        if _is_folder_pattern(spec):
+            matched = [name for name in available if fnmatch.fnmatchcase(name, spec)]
+        else:
+            matched = [spec]
+        folders += [name for name in matched if name not in folders]
+    return folders
+
+
+def _is_folder_pattern(spec: str) -> bool:
+    return any(char in spec for char in "*?[")
+
+
+_server_slots: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def server_slots(server: str, limit: int) -> asyncio.Semaphore:
+    slots = _server_slots.setdefault(asyncio.get_running_loop(), {})
+    if server not in slots:
+        slots[server] = asyncio.Semaphore(limit)
+    return slots[server]
+
+
+class MailboxSync:
+    def __init__(
+        self, connection: MailConnection, state: dict[str, Any], limit: Optional[int]
+    ):
+        self.connection = connection
+        self._state = state
+        self._limit = limit
+        self.next_state: Optional[dict[str, Any]] = None
+        self._uidl: dict[int, str] = {}
+
+    def message_ids(self) -> list[int]:
+        if self.connection.total == 0:
+            return []
+        if self.connection.is_imap:
+            ids = self._new_imap_uids()
+        else:
+            ids = self._new_pop_numbers()
+        ids = sorted(ids, reverse=True)
+        if self._limit:
+            ids = ids[: self._limit]
+        return ids
+
+    def _new_imap_uids(self) -> list[int]:
+        uidvalidity = self.connection.uidvalidity
+        last_uid = 0
+        if self._state.get("uidvalidity") == uidvalidity:
+            last_uid = self._state.get("last_uid", 0)
+        elif self._state:
+            logger.info(f"UIDVALIDITY changed for {self.connection.mailbox}, resyncing")
+        self.next_state = {"uidvalidity": uidvalidity, "last_uid": last_uid}
+        return self.connection.search_uids(after=last_uid)
+
+    def _new_pop_numbers(self) -> list[int]:
+        uidl = self.connection.list_uidl()
+        seen = set(self._state.get("seen_uids", []))
+        self._uidl = {num: uid for uid, num in uidl.items()}
+        self.next_state = {"seen_uids": [uid for uid in uidl if uid in seen]}
+        return [num for uid, num in uidl.items() if uid not in seen]
+
+    def advance(self, attempted: list[int], fetched: set[int]) -> None:
+        if self.next_state is None:
+            return
+        if self.connection.is_imap:
+            for uid in sorted(attempted):
+                if uid not in fetched:
+                    break
+                self.next_state["last_uid"] = max(self.next_state["last_uid"], uid)
+        else:
+            self.next_state["seen_uids"] += [self._uidl[num] for num in sorted(fetched)]
 
 
 class MailCrawler(Crawler):
     def __init__(
         self,
-        server: str,
-        port: int,
-        username: str,
-        password: str,
+        accounts: list[MailAccount],
         database: str,
         collection: str,
+        folders: Optional[list[str]] = None,
         limit: Optional[int] = None,
-        use_ssl: bool = True,
+        incremental: bool = True,
+        headers_only: bool = False,
+        chunk_size: int = 200,
+        store_attachments: bool = False,
+        max_connections: int = 8,
+        max_per_server: int = 4,
     ):
         super().__init__(database, collection)
+        self._accounts = accounts
+        self._folders = folders or ["INBOX"]
         self._limit = limit
-        self._connection = MailConnection(server, port, username, password, use_ssl)
-        self._parser = MessageParser()
+        self._store_attachments = store_attachments and not headers_only
+        self._attachments: Optional[AttachmentStore] = None
+        self._incremental = incremental
+        self._headers_only = headers_only
+        self._chunk_size = chunk_size
+        self._max_connections = max_connections
+        self._max_per_server = max_per_server
+        self._db: Optional[Database] = None
+        self._next_states: dict[str, dict[str, Any]] = {}
+        self._failed: list[str] = []
 
-    def crawl(self) -> list[dict]:
-        if not self._connection.connect():
-            return []
+    async def execute(self, db: Database) -> dict[str, Any]:
+        if self._store_attachments:
+            bucket = get_settings().mail_attachment_bucket
+            self._attachments = AttachmentStore(db.db.delegate, bucket)
+        self._db = db
+        self._next_states = {}
+        self._failed = []
+        result = await super().execute(db)
+        if self._incremental and result["success"]:
+            for key, state in self._next_states.items():
+                await db.save_state(key, state)
+        if self._failed:
+            result["failed_mailboxes"] = self._failed
+        return result
+
+    async def crawl(self) -> AsyncIterator[dict]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._chunk_size)
+        stopped = threading.Event()
+        slots = asyncio.Semaphore(self._max_connections)
+        producer = asyncio.create_task(self._crawl_accounts(queue, slots, stopped))
         try:
-            return self._fetch_all()
+            while (item := await queue.get()) is not DONE:
+                yield item
+            await producer
         finally:
-            self._connection.disconnect()
+            stopped.set()
+            producer.cancel()
+            self._drain(queue)
 
-    def _fetch_all(self) -> list[dict]:
-        return [
-            msg for msg_id in self._message_ids() if (msg := self._fetch_one(msg_id))
-        ]
+    async def _crawl_accounts(
+        self, queue: asyncio.Queue, slots: asyncio.Semaphore, stopped: threading.Event
+    ) -> None:
+        try:
+            await asyncio.gather(
+                *(self._crawl_account(account, queue, slots, stopped) for account in self._accounts)
+            )
+        finally:
+            await queue.put(DONE)
 
-    def _message_ids(self) -> list[bytes]:
-        if self._connection.total == 0:
-            return []
-        start = max(1, self._connection.total - self._limit + 1) if self._limit else 1
-        return [str(i).encode() for i in range(self._connection.total, start - 1, -1)]
+    async def _crawl_account(
+        self,
+        account: MailAccount,
+        queue: asyncio.Queue,
+        slots: asyncio.Semaphore,
+        stopped: threading.Event,
+    ) -> None:
+        folders = await self._resolve_folders(account, slots)
+        await asyncio.gather(
+            *(self._crawl_mailbox(account, folder, queue, slots, stopped) for folder in folders)
+        )
 
-    def _fetch_one(self, msg_id: bytes) -> Optional[dict]:
-        raw = self._connection.fetch(msg_id)
-        if not raw:
-            return None
-        email_obj = self._parser.parse(raw)
-        return email_obj.to_dict() if email_obj else None
+    async def _resolve_folders(
+        self, account: MailAccount, slots: asyncio.Semaphore
+    ) -> list[str]:
+        connection = account.connection()
+        if not connection.is_imap:
+            return ["INBOX"]
+        if not any(map(_is_folder_pattern, self._folders)):
+            return self._folders
+        async with self._connection_slot(account, slots):
+            try:
+                available = await self.executor.run_io(self._list_folders, connection)
+            except Exception as e:
+                self._logger.warning(f"Folder listing failed for {connection.mailbox}: {e}")
+                self._failed.append(connection.mailbox)
+                return []
+        folders = match_folders(self._folders, available)
+        self._logger.info(f"Crawling {len(folders)} folders for {account.username}@{account.server}")
+        return folders
+
+    @staticmethod
+    def _list_folders(connection: MailConnection) -> list[str]:
+        if not connection.connect():
+            raise ConnectionError("could not connect or select the folder")
+        try:
+            return connection.list_folders()
+        finally:
+            connection.disconnect()
+
+    @asynccontextmanager
+    async def _connection_slot(
+        self, account: MailAccount, slots: asyncio.Semaphore
+    ) -> AsyncIterator[None]:
+        async with server_slots(account.server.lower(), self._max_per_server), slots:
+            yield
+
+    async def _crawl_mailbox(
+        self,
+        account: MailAccount,
+        folder: str,
+        queue: asyncio.Queue,
+        slots: asyncio.Semaphore,
+        stopped: threading.Event,
+    ) -> None:
+        connection = account.connection(folder)
+        key = self._state_key(connection)
+        state: dict[str, Any] = {}
+        if self._incremental and self._db is not None:
+            state = await self._db.load_state(key) or {}
+        sync = MailboxSync(connection, state, self._limit)
+        async with self._connection_slot(account, slots):
+            try:
+                await self._pump(partial(self._read_mailbox, sync), queue.put, stopped)
+            except Exception as e:
+                self._logger.warning(f"Mailbox {connection.mailbox} failed: {e}")
+                self._failed.append(connection.mailbox)
+                return
+        if sync.next_state is not None:
+            self._next_states[key] = sync.next_state
+
+    def _state_key(self, connection: MailConnection) -> str:
+        mode = ":headers" if self._headers_only else ""
+        return f"mail:{self._collection}:{connection.mailbox}{mode}"
+
+    def _read_mailbox(self, sync: MailboxSync) -> Iterator[dict]:
+        connection = sync.connection
+        if not connection.connect():
+            raise ConnectionError("could not connect or select the folder")
+        try:
+            msg_ids = sync.message_ids()
+            fetched: set[int] = set()
+            yield from self._fetch_all(connection, msg_ids, fetched)
+            sync.advance(msg_ids, fetched)
+        finally:
+            connection.disconnect()
+
+    def _fetch_all(
+        self, connection: MailConnection, msg_ids: list[int], fetched: set[int]
+    ) -> Iterator[dict]:
+        max_pending = max(2, 2 * self.executor.process_workers)
+        pending: deque[tuple[list[bytes], list[int], Future]] = deque()
+        for start in range(0, len(msg_ids), self._chunk_size):
+            chunk = msg_ids[start : start + self._chunk_size]
+            with self._stage("fetch").time():
+                messages = connection.fetch_many(chunk, self._headers_only)
+            found = [msg_id for msg_id in chunk if msg_id in messages]
+            fetched.update(found)
+            raws = [messages[msg_id][0] for msg_id in found]
+            BYTES_IN.labels(self._name).inc(sum(map(len, raws)))
+            sizes = [messages[msg_id][1] for msg_id in found]
+            parsed = self.executor.submit_process(
+                parse_messages, raws, self._attachments is not None
+            )
+            pending.append((raws, sizes, parsed))
+            if len(pending) > max_pending:
+                yield from self._collect(*pending.popleft())
+        while pending:
+            yield from self._collect(*pending.popleft())
+
+    def _collect(self, raws: list[bytes], sizes: list[int], parsed: Future) -> list[dict]:
+        try:
+            results, durations = parsed.result()
+        except Exception as e:
+            self._logger.warning(f"Parse worker failed, parsing inline: {type(e).__name__}")
+            results, durations = parse_messages(raws, self._attachments is not None)
+        parse_stage = self._stage("parse")
+        for duration in durations:
+            parse_stage.observe(duration)
+        items = []
+        for raw, data, size in zip(raws, results, sizes):
+            if not data:
+                continue
+            data["size"] = size
+            spans = data.pop("_spans", [])
+            if self._attachments:
+                data["attachments"] = [
+                    self._store_attachment(raw, meta, span)
+                    for meta, span in zip(data["attachments"], spans)
+                ]
+            if self._headers_only:
+                del data["text_body"], data["html_body"], data["attachments"]
+            items.append(data)
+        return items
+
+    def _store_attachment(
+        self, raw: bytes, meta: dict[str, Any], span: AttachmentSpan
+    ) -> dict[str, Any]:
+        try:
+            ref = self._attachments.save(
+                lambda: iter_attachment(raw, span), meta["filename"], meta["content_type"]
+            )
+            return {**meta, **ref}
+        except Exception as e:
+            self._logger.warning(f"Failed to store attachment {meta['filename']}: {e}")
+            return meta
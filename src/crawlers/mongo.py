@@ -1,28 +1,258 @@
-from typing import Any, Optional
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterator, Mapping, Optional
 
-from bson import ObjectId
-from pymongo import MongoClient
+import bson
+from bson import Decimal128, Int64, ObjectId
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo import DeleteOne, ReplaceOne
+from pymongo.change_stream import ChangeStream
+from pymongo.collection import Collection
+from pymongo.cursor import Cursor
+from pymongo.errors import OperationFailure, PyMongoError
 
 from src.crawlers.base import Crawler
+from src.domain.models import CrawlProgress
+from src.infrastructure.database import (
+    BulkWriter,
+    BulkWriteStats,
+    CRAWL_FIELD,
+    Database,
+    crawl_content,
+    fingerprint,
+    get_mongo_clients,
+)
+from src.infrastructure.metrics import ITEMS
+
+
+def id_type(value: Any) -> type:
+    if isinstance(value, (int, float, Int64, Decimal128)):
+        return float
+    return type(value)
+
+
+def field_value(doc: Mapping[str, Any], path: str) -> Any:
+    value: Any = doc
+    for key in path.split("."):
+        if not isinstance(value, Mapping):
+            return None
+        value = value.get(key)
+    return value
+
+
+_RAW_STRING_ID = b"\x02_id\x00"
+_RAW_OBJECT_ID = b"\x07_id\x00"
+
+
+def raw_with_string_id(raw: bytes) -> tuple[str, bytes]:
+    head = raw[4:9]
+    if head == _RAW_STRING_ID:
+        length = int.from_bytes(raw[9:13], "little")
+        return raw[13 : 12 + length].decode(), raw
+    if head == _RAW_OBJECT_ID:
+        doc_id = raw[9:21].hex()
+        body = _RAW_STRING_ID + (25).to_bytes(4, "little") + doc_id.encode() + b"\x00" + raw[21:]
+        return doc_id, (len(body) + 4).to_bytes(4, "little") + body
+    doc = MongoCrawler._ensure_id(bson.decode(raw))
+    return doc["_id"], bson.encode(doc)
+
+
+@dataclass
+class SourceQuery:
+    filter: dict[str, Any] = field(default_factory=dict)
+    projection: Optional[dict[str, Any]] = None
+    sort: Optional[list[tuple[str, int]]] = None
+    hint: Any = None
+    pipeline: Optional[list[dict[str, Any]]] = None
 
 
 class MongoConnection:
-    def __init__(self, uri: str, database: str, collection: str, limit: Optional[int]):
-        self._client = MongoClient(uri)
-        self._collection = self._client[database][collection]
+    _oversample = 20
+    _await_ms = 1000
+
+    def __init__(
+        self,
+        uri: str,
+        database: str,
+        collection: str,
+        limit: Optional[int],
+        query: Optional[SourceQuery] = None,
+        raw: bool = False,
+    ):
+        self._uri = uri
+        self._database = database
+        self._collection_name = collection
+        self._raw = raw
+        self._collection: Optional[Collection] = None
         self._limit = limit
+        self._query = query or SourceQuery()
+
+    def open(self) -> None:
+        client = get_mongo_clients().acquire_sync(self._uri)
+        self._collection = client[self._database][self._collection_name]
+        if self._raw:
+            self._collection = self._collection.with_options(
+                codec_options=CodecOptions(document_class=RawBSONDocument)
+            )
 
-    def fetch_all(self) -> list[dict[str, Any]]:
-        cursor = self._collection.find({}).sort("_id", -1)
+    def close(self) -> None:
+        if self._collection is not None:
+            self._collection = None
+            get_mongo_clients().release_sync(self._uri)
+
+    def iter_all(self) -> Iterator[dict[str, Any]]:
+        if self._query.pipeline is not None:
+            return self._aggregate()
+        cursor = self._find()
+        cursor = cursor.sort(self._query.sort) if self._query.sort else cursor.sort("_id", -1)
         if self._limit:
             cursor = cursor.limit(self._limit)
-        return list(cursor)
+        return cursor
 
-    def close(self) -> None:
-        self._client.close()
+    def _aggregate(self) -> Iterator[dict[str, Any]]:
+        pipeline = list(self._query.pipeline)
+        if self._limit:
+            pipeline.append({"$limit": self._limit})
+        hint = self._query.hint
+        options = {"hint": dict(hint) if isinstance(hint, list) else hint} if hint else {}
+        return self._collection.aggregate(pipeline, allowDiskUse=True, **options)
+
+    def _find(self, bounds: Optional[dict[str, Any]] = None) -> Cursor:
+        query = self._query.filter
+        if bounds:
+            query = {"$and": [query, bounds]} if query else bounds
+        cursor = self._collection.find(query, self._query.projection)
+        if self._query.hint:
+            cursor = cursor.hint(self._query.hint)
+        return cursor
+
+    def split_points(self, partitions: int) -> list[Any]:
+        first = self._edge_id(1)
+        last = self._edge_id(-1)
+        if first is None or id_type(first) is not id_type(last):
+            return []
+        match = [{"$match": self._query.filter}] if self._query.filter else []
+        sample = self._collection.aggregate(
+            match
+            + [
+                {"$sample": {"size": partitions * self._oversample}},
+                {"$project": {"_id": 1}},
+                {"$sort": {"_id": 1}},
+            ]
+        )
+        ids = [doc["_id"] for doc in sample]
+        points: list[Any] = []
+        for i in range(1, partitions):
+            point = ids[i * len(ids) // partitions] if ids else None
+            if point is not None and point != first and (not points or point != points[-1]):
+                points.append(point)
+        return points
+
+    def _edge_id(self, direction: int) -> Any:
+        cursor = self._collection.find(self._query.filter, {"_id": 1})
+        cursor = cursor.sort("_id", direction).limit(1)
+        doc = next(iter(cursor), None)
+        return doc["_id"] if doc else None
+
+    def iter_batches(
+        self,
+        batch_size: int,
+        after: Any = None,
+        lower: Any = None,
+        upper: Any = None,
+    ) -> Iterator[list[dict[str, Any]]]:
+        if self._limit and after is None and lower is None and upper is None:
+            lower = self._newest_floor()
+        bounds = {}
+        if after is not None:
+            bounds["$gt"] = after
+        elif lower is not None:
+            bounds["$gte"] = lower
+        if upper is not None:
+            bounds["$lt"] = upper
+        query = {"_id": bounds} if bounds else {}
+        yield from self._batches(query, [("_id", 1)], batch_size)
+
+    def _newest_floor(self) -> Any:
+        cursor = self._collection.find(self._query.filter, {"_id": 1})
+        cursor = cursor.sort("_id", -1).skip(self._limit - 1).limit(1)
+        doc = next(iter(cursor), None)
+        return doc["_id"] if doc else None
+
+    def iter_newer(
+        self, field: str, after: Any, batch_size: int, after_id: Any = None
+    ) -> Iterator[list[dict[str, Any]]]:
+        if field == "_id":
+            query = {"_id": {"$gt": after}} if after is not None else {}
+            return self._batches(query, [("_id", 1)], batch_size, self._limit)
+        return self._batches(
+            self._newer_query(field, after, after_id),
+            [(field, 1), ("_id", 1)],
+            batch_size,
+            self._limit,
+        )
+
+    @staticmethod
+    def _newer_query(field: str, after: Any, after_id: Any) -> dict[str, Any]:
+        if after is None:
+            return {}
+        if after_id is None:
+            return {field: {"$gte": after}}
+        return {
+            "$or": [
+                {field: {"$gt": after}},
+                {field: after, "_id": {"$gt": after_id}},
+            ]
+        }
+
+    def _batches(
+        self,
+        query: dict[str, Any],
+        sort: list[tuple[str, int]],
+        batch_size: int,
+        limit: Optional[int] = None,
+    ) -> Iterator[list[dict[str, Any]]]:
+        cursor = self._find(query).sort(sort).batch_size(batch_size)
+        if limit:
+            cursor = cursor.limit(limit)
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def current_token(self) -> Any:
+        with self._collection.watch() as stream:
+            return stream.resume_token
+
+    def watch(self, resume_after: Any) -> ChangeStream:
+        return self._collection.watch(
+            full_document="updateLookup",
+            resume_after=resume_after,
+            max_await_time_ms=self._await_ms,
+        )
+
+    @staticmethod
+    def next_events(stream: ChangeStream, max_count: int) -> tuple[list[dict], Any]:
+        events = []
+        while len(events) < max_count and stream.alive:
+            event = stream.try_next()
+            if event is None:
+                break
+            events.append(event)
+        return events, stream.resume_token
 
 
 class MongoCrawler(Crawler):
+    _prefetch_batches = 2
+    _lost_history_codes = (260, 280, 286)
+
     def __init__(
         self,
         source_uri: str,
@@ -31,29 +261,352 @@ class MongoCrawler(Crawler):
         target_database: str,
         target_collection: str,
         limit: Optional[int] = None,
+        stream: bool = False,
+        batch_size: int = 1000,
+        resume: bool = True,
+        partitions: int = 1,
+        sync: Optional[str] = None,
+        sync_field: str = "_id",
+        tail_seconds: Optional[float] = None,
+        query: Optional[SourceQuery] = None,
+        raw: bool = False,
     ):
         super().__init__(target_database, target_collection)
         self._connection = MongoConnection(
-            source_uri, source_database, source_collection, limit
+            source_uri, source_database, source_collection, limit, query, raw
         )
+        self._raw = raw
+        self._stream = stream
+        self._batch_size = batch_size
+        self._resume = resume
+        self._partitions = partitions
+        self._sync = sync
+        self._sync_field = sync_field
+        self._tail_seconds = tail_seconds
+        source = self._build_source_key(
+            source_uri, source_database, source_collection, target_collection
+        )
+        self._checkpoint_key = f"mongo-copy:{source}"
+        self._sync_key = f"mongo-sync:{source}:{sync_field}"
+        self._tail_key = f"mongo-tail:{source}"
 
-    def crawl(self) -> list[dict]:
+    def crawl(self) -> Iterator[dict]:
         try:
-            docs = self._connection.fetch_all()
-            self._logger.info(f"Fetched {len(docs)} documents")
-            return self._ensure_ids(docs)
+            for doc in self._connection.iter_all():
+                yield self._ensure_id(doc)
         except Exception as e:
             self._logger.error(f"Crawl failed: {e}")
-            return []
+
+    async def execute(self, db: Database) -> dict[str, Any]:
+        self.progress = CrawlProgress()
+        await self.executor.run_io(self._connection.open)
+        try:
+            return await self._execute(db)
         finally:
-            self._connection.close()
+            await self.executor.run_io(self._connection.close)
 
-    @staticmethod
-    def _ensure_ids(docs: list[dict]) -> list[dict]:
+    async def _execute(self, db: Database) -> dict[str, Any]:
+        if self._sync == "tail":
+            return await self._tail(db)
+        if self._sync == "incremental":
+            return await self._incremental_sync(db)
+        if self._partitions > 1:
+            return await self._parallel_copy(db)
+        if not (self._stream or self._raw):
+            return await super().execute(db)
+        return await self._stream_copy(db)
+
+    async def _stream_copy(self, db: Database) -> dict[str, Any]:
+        checkpoint = await db.load_state(self._checkpoint_key) if self._resume else None
+        after = checkpoint["last_id"] if checkpoint else None
+        if after is not None:
+            self._logger.info(f"Resuming copy after _id={after}")
+
+        writer = db.bulk_writer(self._collection, on_batch=self._record_batch)
+
+        async def save(last_id: Any) -> None:
+            await db.save_state(self._checkpoint_key, {"last_id": last_id})
+
+        batches = self._connection.iter_batches(self._batch_size, after)
+        try:
+            checkpointing = await self._copy_range(writer, save, batches)
+        except PyMongoError as e:
+            total = self.progress.fetched
+            self._logger.error(f"Stream copy failed after {total} documents: {e}")
+            result = self._result(total, writer.stats)
+            return {**result, "success": False, "message": f"Failed: {e}"}
+
+        if checkpointing:
+            await db.clear_state(self._checkpoint_key)
+        total = self.progress.fetched
+        self._logger.info(f"Copied {total} documents in {len(writer.stats.batches)} batches")
+        return self._result(total, writer.stats)
+
+    async def _incremental_sync(self, db: Database) -> dict[str, Any]:
+        state = await db.load_state(self._sync_key) or {}
+        after = state.get("last_value")
+        if after is not None:
+            self._logger.info(f"Syncing documents with {self._sync_field} past {after}")
+        writer = db.bulk_writer(self._collection, on_batch=self._record_batch)
+
+        async def save(mark: tuple[Any, Any]) -> None:
+            value, doc_id = mark
+            await db.save_state(self._sync_key, {"last_value": value, "last_id": doc_id})
+
+        batches = self._connection.iter_newer(
+            self._sync_field, after, self._batch_size, state.get("last_id")
+        )
+        try:
+            await self._copy_range(writer, save, batches, self._sync_mark)
+        except PyMongoError as e:
+            self._logger.error(f"Incremental sync failed: {e}")
+            result = self._result(self.progress.fetched, writer.stats)
+            return {**result, "success": False, "message": f"Failed: {e}"}
+        self._logger.info(f"Synced {self.progress.fetched} new documents")
+        return self._result(self.progress.fetched, writer.stats)
+
+    async def _tail(self, db: Database) -> dict[str, Any]:
+        state = await db.load_state(self._tail_key) or {}
+        token = state.get("resume_token")
+        writer = db.bulk_writer(self._collection, on_batch=self._record_batch)
+        try:
+            if token is None:
+                token = await self._initial_sync(db, writer)
+            message = await self._follow(db, writer, token)
+        except OperationFailure as e:
+            self._logger.error(f"Change stream failed: {e}")
+            if e.code in self._lost_history_codes:
+                await db.clear_state(self._tail_key)
+                message = "Resume token expired, the next run resyncs from scratch"
+            else:
+                message = f"Failed: {e}"
+            result = self._result(self.progress.fetched, writer.stats)
+            return {**result, "success": False, "message": message}
+        except PyMongoError as e:
+            self._logger.error(f"Tailing failed: {e}")
+            result = self._result(self.progress.fetched, writer.stats)
+            return {**result, "success": False, "message": f"Failed: {e}"}
+        result = self._result(self.progress.fetched, writer.stats)
+        return {**result, "message": message}
+
+    async def _initial_sync(self, db: Database, writer: BulkWriter) -> Any:
+        token = await self.executor.run_io(self._connection.current_token)
+        self._logger.info("No resume token, copying the source before tailing")
+
+        async def save(_: Any) -> None:
+            pass
+
+        batches = self._connection.iter_batches(self._batch_size)
+        if not await self._copy_range(writer, save, batches):
+            raise PyMongoError("Initial copy had write errors")
+        await db.save_state(self._tail_key, {"resume_token": token})
+        return token
+
+    async def _follow(self, db: Database, writer: BulkWriter, token: Any) -> str:
+        deadline = time.monotonic() + self._tail_seconds if self._tail_seconds else None
+        stream = await self.executor.run_io(self._connection.watch, token)
+        try:
+            while deadline is None or time.monotonic() < deadline:
+                if not stream.alive:
+                    await db.clear_state(self._tail_key)
+                    return "Change stream invalidated, the next run resyncs from scratch"
+                events, next_token = await self.executor.run_io(
+                    self._connection.next_events, stream, self._batch_size
+                )
+                errors = writer.stats.errors
+                if events:
+                    await self._apply(events, writer)
+                    await writer.flush()
+                if writer.stats.errors != errors:
+                    raise PyMongoError("Applying changes had write errors")
+                if next_token is not None and next_token != token:
+                    token = next_token
+                    await db.save_state(self._tail_key, {"resume_token": token})
+        finally:
+            await self.executor.run_io(stream.close)
+        return "Completed"
+
+    async def _apply(self, events: list[dict], writer: BulkWriter) -> None:
+        changes: dict[Any, Optional[dict]] = {}
+        for event in events:
+            operation = event["operationType"]
+            if operation in ("insert", "update", "replace"):
+                doc = event.get("fullDocument")
+                if doc is not None:
+                    doc = self._ensure_id(doc)
+                    changes[doc["_id"]] = doc
+            elif operation == "delete":
+                doc_id = self._ensure_id(dict(event["documentKey"]))["_id"]
+                changes[doc_id] = None
+        upserts = [doc for doc in changes.values() if doc is not None]
+        self.progress.fetched += len(upserts)
+        ITEMS.labels(self._name, "fetched").inc(len(upserts))
+        if upserts:
+            await self._replace(upserts, writer)
+        for doc_id, doc in changes.items():
+            if doc is None:
+                await writer.add(DeleteOne({"_id": doc_id}), 0)
+                ITEMS.labels(self._name, "deleted").inc()
+
+    async def _replace(self, docs: list[dict], writer: BulkWriter) -> None:
+        now = self._now()
+        ids = [doc["_id"] for doc in docs]
+        stored = await writer.stored_meta(ids)
         for doc in docs:
-            if "_id" not in doc:
-                doc["_id"] = str(ObjectId())
-            elif not isinstance(doc["_id"], str):
-                doc["_id"] = str(doc["_id"])
-        return docs
+            content = crawl_content(doc)
+            digest, size = fingerprint(content)
+            previous = stored.get(doc["_id"], {})
+            if previous.get("hash") == digest:
+                self._skip_unchanged(writer)
+                continue
+            replacement = {
+                "_id": doc["_id"],
+                **content,
+                CRAWL_FIELD: {
+                    "hash": digest,
+                    "created_at": previous.get("created_at", now),
+                    "updated_at": now,
+                },
+            }
+            await writer.add(ReplaceOne({"_id": doc["_id"]}, replacement, upsert=True), size)
+
+    async def _parallel_copy(self, db: Database) -> dict[str, Any]:
+        key = f"{self._checkpoint_key}:p{self._partitions}"
+        state = await db.load_state(key) if self._resume else None
+        if state:
+            bounds = state["bounds"]
+        else:
+            points = await self.executor.run_io(self._connection.split_points, self._partitions)
+            bounds = [None, *points, None]
+            await db.save_state(key, {"bounds": bounds, "ranges": {}})
+        checkpoints = (state or {}).get("ranges", {})
+        ranges = [
+            (str(i), bounds[i], bounds[i + 1])
+            for i in range(len(bounds) - 1)
+            if not checkpoints.get(str(i), {}).get("done")
+        ]
+        if state:
+            self._logger.info(f"Resuming {len(ranges)} of {len(bounds) - 1} ranges")
+        else:
+            self._logger.info(f"Copying in {len(ranges)} ranges")
 
+        outcomes = await asyncio.gather(
+            *(
+                self._copy_partition(db, key, index, lower, upper, checkpoints.get(index, {}))
+                for index, lower, upper in ranges
+            )
+        )
+        stats = BulkWriteStats(
+            batches=[batch for _, writer in outcomes for batch in writer.stats.batches],
+            unchanged=sum(writer.stats.unchanged for _, writer in outcomes),
+        )
+        failed = [index for (index, _, _), (ok, _) in zip(ranges, outcomes) if not ok]
+        total = self.progress.fetched
+        result = self._result(total, stats)
+        result["partitions"] = {"total": len(bounds) - 1, "copied": len(ranges) - len(failed)}
+        if failed:
+            self._logger.error(f"Ranges {failed} failed, rerun to retry them")
+            return {
+                **result,
+                "success": False,
+                "message": f"{len(failed)} ranges failed",
+                "failed_ranges": failed,
+            }
+        await db.clear_state(key)
+        self._logger.info(f"Copied {total} documents in {len(bounds) - 1} ranges")
+        return result
+
+    async def _copy_partition(
+        self,
+        db: Database,
+        key: str,
+        index: str,
+        lower: Any,
+        upper: Any,
+        checkpoint: dict[str, Any],
+    ) -> tuple[bool, BulkWriter]:
+        writer = db.bulk_writer(self._collection, on_batch=self._record_batch)
+
+        async def save(last_id: Any) -> None:
+            await db.save_state(key, {f"ranges.{index}": {"last_id": last_id}})
+
+        batches = self._connection.iter_batches(
+            self._batch_size, checkpoint.get("last_id"), lower, upper
+        )
+        try:
+            clean = await self._copy_range(writer, save, batches)
+        except PyMongoError as e:
+            self._logger.error(f"Range {index} failed: {e}")
+            return False, writer
+        if clean:
+            await db.save_state(key, {f"ranges.{index}": {"done": True}})
+        return clean, writer
+
+    async def _copy_range(
+        self,
+        writer: BulkWriter,
+        save: Callable[[Any], Awaitable[None]],
+        batches: Iterator[list[dict]],
+        mark: Callable[[Mapping[str, Any]], Any] = lambda doc: doc.get("_id"),
+    ) -> bool:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._prefetch_batches)
+        reader = asyncio.create_task(self._read_batches(queue, batches))
+        checkpointing = True
+        try:
+            while (batch := await queue.get()) is not None:
+                last_value = mark(batch[-1])
+                errors = writer.stats.errors
+                self.progress.fetched += len(batch)
+                ITEMS.labels(self._name, "fetched").inc(len(batch))
+                if self._raw:
+                    await self._write_raw(batch, writer)
+                else:
+                    await self._write([self._ensure_id(doc) for doc in batch], writer)
+                await writer.flush()
+                checkpointing = checkpointing and writer.stats.errors == errors
+                if checkpointing and last_value is not None:
+                    await save(last_value)
+            await reader
+        finally:
+            reader.cancel()
+        return checkpointing
+
+    def _sync_mark(self, doc: Mapping[str, Any]) -> Optional[tuple[Any, Any]]:
+        value = field_value(doc, self._sync_field)
+        return None if value is None else (value, doc.get("_id"))
+
+    async def _write_raw(self, batch: list[RawBSONDocument], writer: BulkWriter) -> None:
+        for doc in batch:
+            doc_id, raw = raw_with_string_id(doc.raw)
+            op = ReplaceOne({"_id": doc_id}, RawBSONDocument(raw), upsert=True)
+            await writer.add(op, len(raw))
+
+    async def _read_batches(
+        self, queue: asyncio.Queue, batches: Iterator[list[dict]]
+    ) -> None:
+        try:
+            while (
+                batch := await self.executor.run_io(self._next_batch, batches)
+            ) is not None:
+                await queue.put(batch)
+        finally:
+            await queue.put(None)
+
+    def _next_batch(self, batches: Iterator[list[dict]]) -> Optional[list[dict]]:
+        with self._stage("fetch").time():
+            return next(batches, None)
+
+    @staticmethod
+    def _build_source_key(
+        uri: str, database: str, collection: str, target_collection: str
+    ) -> str:
+        source = hashlib.sha1(uri.encode()).hexdigest()[:12]
+        return f"{source}:{database}.{collection}:{target_collection}"
+
+    @staticmethod
+    def _ensure_id(doc: dict) -> dict:
+        if "_id" not in doc:
+            doc["_id"] = str(ObjectId())
+        elif not isinstance(doc["_id"], str):
+            doc["_id"] = str(doc["_id"])
+        return doc
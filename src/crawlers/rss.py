@@ -1,17 +1,367 @@
-from datetime import datetime
-from typing import Any
+import asyncio
+import hashlib
+import importlib.util
+import re
+import xml.etree.ElementTree as ElementTree
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import partial
+from io import BytesIO
+from typing import Any, AsyncIterator, Callable, Optional
+from urllib.parse import urlsplit
 
 import feedparser
+from pymongo import UpdateOne
 
+from src.config.settings import get_settings
 from src.crawlers.base import Crawler
 from src.domain.models import RssArticle
-from src.infrastructure.http import HttpClient
+from src.infrastructure.database import Database
+from src.infrastructure.host_health import CircuitOpenError, create_host_health_tracker
+from src.infrastructure.http import AsyncHttpClient, HttpResponse, RetryPolicy
+from src.infrastructure.logger import setup_logger
+from src.infrastructure.metrics import BYTES_IN, FEEDS_PARSED
+
+
+logger = setup_logger(__name__)
+
+try:
+    from feedparser.datetimes import _parse_date
+    from feedparser.html import _cp1252
+    from feedparser.mixin import _FeedParserMixin
+    from feedparser.sanitizer import _sanitize_html
+    from feedparser.urls import _urljoin, resolve_relative_uris
+
+    STREAMING_SUPPORTED = feedparser.__version__.startswith("6.0.")
+except ImportError:
+    STREAMING_SUPPORTED = False
+
+ATOM = "http://www.w3.org/2005/Atom"
+CONTENT = "http://purl.org/rss/1.0/modules/content/"
+DC = "http://purl.org/dc/elements/1.1/"
+XML_BASE = "{http://www.w3.org/XML/1998/namespace}base"
+IGNORED_NAMESPACES = {
+    "http://wellformedweb.org/commentAPI/",
+    "http://purl.org/rss/1.0/modules/slash/",
+    "http://rssnamespace.org/feedburner/ext/1.0",
+}
+HTML_TYPES = {"text/html", "application/xhtml+xml"}
+MARKUP_ELEMENTS = {"title", "description", "summary", "content"}
+
+
+class UnsupportedFeed(Exception):
+    pass
+
+
+@dataclass
+class ParsedFeed:
+    articles: list[RssArticle]
+    parser: str
+
+
+def _iterparse() -> tuple[str, Callable]:
+    if importlib.util.find_spec("lxml") is not None:
+        from lxml import etree
+
+        return "lxml", partial(etree.iterparse, resolve_entities=False, no_network=True)
+    return "etree", ElementTree.iterparse
+
+
+class StreamingFeedParser:
+    _prolog = re.compile(rb"\s*(?:<\?.*?\?>|<!--.*?-->)", re.S)
+    _encoding = re.compile(rb"""^<\?xml[^>]*encoding=["']([^"']+)""")
+    _rss_fields = {
+        ("", "title"): "title",
+        ("", "link"): "link",
+        ("", "description"): "summary",
+        ("", "author"): "author",
+        (DC, "creator"): "author",
+        ("", "pubdate"): "published",
+        (DC, "date"): "updated",
+        ("", "guid"): "guid",
+        (CONTENT, "encoded"): "content",
+    }
+    _rss_ignored = {("", "category"), ("", "comments"), ("", "enclosure"), ("", "source")}
+    _atom_fields = {
+        "title": "title",
+        "id": "guid",
+        "published": "published",
+        "updated": "updated",
+        "summary": "summary",
+        "content": "content",
+    }
+    _atom_ignored = {"category", "contributor", "rights", "source"}
+    _atom_person = {"name", "email", "uri"}
+
+    def __init__(self):
+        self.name, self._iterparse = _iterparse()
+
+    def parse(self, content: str | bytes, feed_url: str) -> list[RssArticle]:
+        if not isinstance(content, bytes):
+            raise UnsupportedFeed("Text input, the encoding is unknown")
+        self._check_prolog(content)
+        articles = []
+        depth = 0
+        root = None
+        for event, elem in self._iterparse(BytesIO(content), events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 1:
+                    root = self._root_kind(elem)
+                continue
+            depth -= 1
+            if not isinstance(elem.tag, str):
+                continue
+            namespace, name = self._split(elem.tag)
+            if root == "rss" and name == "item" and not namespace:
+                if depth != 2:
+                    raise UnsupportedFeed("RSS item outside the channel")
+                articles.append(self._rss_item(elem, feed_url))
+            elif root == "atom" and name == "entry" and namespace == ATOM:
+                if depth != 1:
+                    raise UnsupportedFeed("Nested Atom entry")
+                articles.append(self._atom_entry(elem, feed_url))
+            elif XML_BASE in elem.attrib:
+                raise UnsupportedFeed("xml:base is not supported")
+            if depth == (2 if root == "rss" else 1):
+                elem.clear()
+        return articles
+
+    def _check_prolog(self, content: bytes) -> None:
+        if content.startswith(b"\xef\xbb\xbf"):
+            content = content[3:]
+        if (declared := self._encoding.match(content)) and declared.group(1).lower() not in (
+            b"utf-8",
+            b"utf8",
+        ):
+            raise UnsupportedFeed(f"Encoding {declared.group(1).decode()}")
+        position = 0
+        while match := self._prolog.match(content, position):
+            position = match.end()
+        if content[position:].lstrip().startswith(b"<!"):
+            raise UnsupportedFeed("Feeds with a DOCTYPE are not supported")
+
+    def _root_kind(self, root: Any) -> str:
+        namespace, name = self._split(root.tag)
+        if name == "rss" and not namespace:
+            return "rss"
+        if name == "feed" and namespace == ATOM:
+            return "atom"
+        raise UnsupportedFeed(f"Unsupported root element {root.tag}")
+
+    def _rss_item(self, item: Any, feed_url: str) -> RssArticle:
+        fields: dict[str, Any] = {}
+        permalink = False
+        for child in self._children(item):
+            tag = self._split(child.tag)
+            key = self._rss_fields.get(tag)
+            if key is None:
+                if (tag in self._rss_ignored and not len(child)) or self._ignorable(child):
+                    continue
+                raise UnsupportedFeed(f"Unsupported item element {child.tag}")
+            if key in fields:
+                raise UnsupportedFeed(f"Repeated item element {child.tag}")
+            if key in ("title", "summary", "content", "link") and child.attrib:
+                raise UnsupportedFeed(f"Attributes on {child.tag}")
+            if key == "guid":
+                attrs = {name.lower(): value for name, value in child.attrib.items()}
+                permalink = attrs.get("ispermalink", "true") == "true"
+            fields[key] = self._text(child)
+
+        guid = fields.pop("guid", None)
+        if "link" in fields:
+            link = self._finish(fields["link"], "link")
+            link = re.sub("&([A-Za-z0-9_]+);", r"&\g<1>", link.replace("&amp;", "&"))
+        elif guid is not None and permalink:
+            link = self._finish(guid, "id")
+        else:
+            link = ""
+        return self._article(
+            title=self._finish(fields.get("title"), "title", "text/plain", guess_html=True),
+            link=link,
+            published=fields.get("published"),
+            updated=fields.get("updated"),
+            summary=self._finish(fields.get("summary"), "description", "text/html"),
+            content=self._finish(fields.get("content"), "content", "text/html"),
+            author=self._finish(fields.get("author"), "author"),
+            feed_url=feed_url,
+        )
+
+    def _atom_entry(self, entry: Any, feed_url: str) -> RssArticle:
+        fields: dict[str, Any] = {}
+        types: dict[str, str] = {}
+        link = None
+        for child in self._children(entry):
+            namespace, name = self._split(child.tag)
+            if namespace != ATOM:
+                if self._ignorable(child):
+                    continue
+                raise UnsupportedFeed(f"Unsupported entry element {child.tag}")
+            if name == "link":
+                link = self._atom_link(child, link)
+                continue
+            if name in self._atom_ignored:
+                continue
+            key = "author" if name == "author" else self._atom_fields.get(name)
+            if key is None:
+                raise UnsupportedFeed(f"Unsupported entry element {child.tag}")
+            if key in fields:
+                raise UnsupportedFeed(f"Repeated entry element {child.tag}")
+            if key == "author":
+                fields[key] = self._atom_author(child)
+                continue
+            if key in ("title", "summary", "content"):
+                types[key] = self._atom_type(child)
+            elif child.attrib:
+                raise UnsupportedFeed(f"Attributes on {child.tag}")
+            fields[key] = self._text(child)
+
+        if link is None and "guid" in fields:
+            link = self._finish(fields["guid"], "id")
+        return self._article(
+            title=self._finish(fields.get("title"), "title", types.get("title")),
+            link=link or "",
+            published=fields.get("published"),
+            updated=fields.get("updated"),
+            summary=self._finish(fields.get("summary"), "summary", types.get("summary")),
+            content=self._finish(fields.get("content"), "content", types.get("content")),
+            author=fields.get("author"),
+            feed_url=feed_url,
+        )
+
+    def _atom_link(self, link: Any, current: Optional[str]) -> Optional[str]:
+        attrs = {key.lower(): value for key, value in link.attrib.items()}
+        if "href" not in attrs or "url" in attrs or "uri" in attrs:
+            raise UnsupportedFeed("Atom link without an href")
+        rel = attrs.get("rel", "alternate").lower()
+        content_type = attrs.get("type", "text/html").lower()
+        if rel == "alternate" and self._content_type(content_type) in HTML_TYPES:
+            return _urljoin("", attrs["href"])
+        return current
+
+    def _atom_author(self, author: Any) -> str:
+        person: dict[str, str] = {}
+        for child in self._children(author):
+            namespace, name = self._split(child.tag)
+            if namespace != ATOM or name not in self._atom_person or name in person:
+                raise UnsupportedFeed(f"Unsupported author element {child.tag}")
+            person[name] = self._text(child).strip()
+        name, email = person.get("name"), person.get("email")
+        if name and email:
+            return f"{name} ({email})"
+        if name or email:
+            return name or email
+        own = (author.text or "") + "".join(child.tail or "" for child in author)
+        return self._finish(own, "author")
+
+    def _atom_type(self, element: Any) -> str:
+        attrs = {key.lower() for key in element.attrib}
+        if attrs - {"type"}:
+            raise UnsupportedFeed(f"Attributes on {element.tag}")
+        content_type = self._content_type(element.get("type", "text/plain").lower())
+        if content_type not in ("text/plain", "text/html"):
+            raise UnsupportedFeed(f"Content type {content_type}")
+        return content_type
+
+    def _article(
+        self,
+        title: str,
+        link: str,
+        published: Optional[str],
+        updated: Optional[str],
+        summary: Optional[str],
+        content: Optional[str],
+        author: Optional[str],
+        feed_url: str,
+    ) -> RssArticle:
+        parsed = self._date(published) or self._date(updated)
+        if summary is None:
+            summary = content
+        return RssArticle(
+            title=title or "",
+            link=link,
+            published=datetime(*parsed[:6]).isoformat() if parsed else "",
+            summary=summary or "",
+            content=(content if content is not None else summary) or "",
+            author=author or "",
+            feed_title="",
+            feed_url=feed_url,
+        )
+
+    def _date(self, value: Optional[str]) -> Any:
+        return _parse_date(self._finish(value, "published")) if value is not None else None
+
+    def _finish(
+        self,
+        value: Optional[str],
+        element: str,
+        content_type: Optional[str] = None,
+        guess_html: bool = False,
+    ) -> Optional[str]:
+        if value is None:
+            return None
+        output = value.strip()
+        if element in ("link", "id") and output:
+            output = _urljoin("", output)
+        if guess_html and _FeedParserMixin.looks_like_html(output):
+            content_type = "text/html"
+        content_type = content_type or "text/html"
+        if (
+            element in MARKUP_ELEMENTS
+            and content_type in HTML_TYPES
+            and ("<" in output or "&" in output or "\r" in output)
+        ):
+            output = resolve_relative_uris(output, "", "utf-8", content_type)
+            output = _sanitize_html(output, "utf-8", content_type)
+        try:
+            output = output.encode("iso-8859-1").decode("utf-8")
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
+        return output.translate(_cp1252)
+
+    def _text(self, element: Any) -> str:
+        if len(element):
+            raise UnsupportedFeed(f"Markup inside {element.tag}")
+        return element.text or ""
+
+    def _ignorable(self, element: Any) -> bool:
+        return self._split(element.tag)[0] in IGNORED_NAMESPACES and not len(element)
+
+    @staticmethod
+    def _children(element: Any) -> list[Any]:
+        for child in element.iter():
+            if XML_BASE in child.attrib:
+                raise UnsupportedFeed("xml:base is not supported")
+        return [child for child in element if isinstance(child.tag, str)]
+
+    @staticmethod
+    def _split(tag: str) -> tuple[str, str]:
+        if tag.startswith("{"):
+            namespace, name = tag[1:].split("}", 1)
+            return namespace, name.lower()
+        return "", tag.lower()
+
+    @staticmethod
+    def _content_type(content_type: str) -> str:
+        return _FeedParserMixin.map_content_type(content_type)
 
 
 class FeedParser:
-    def parse(self, content: str, feed_url: str) -> list[RssArticle]:
+    def __init__(self, streaming: bool = True):
+        if streaming and not STREAMING_SUPPORTED:
+            logger.info(f"Streaming parser disabled for feedparser {feedparser.__version__}")
+            streaming = False
+        self._streaming = StreamingFeedParser() if streaming else None
+
+    def parse(self, content: str | bytes, feed_url: str) -> ParsedFeed:
+        if self._streaming:
+            try:
+                return ParsedFeed(self._streaming.parse(content, feed_url), self._streaming.name)
+            except Exception as e:
+                logger.debug(f"Falling back to feedparser for {feed_url}: {e}")
         feed = feedparser.parse(content)
-        return [self._create_article(entry, feed_url) for entry in feed.entries]
+        articles = [self._create_article(entry, feed_url) for entry in feed.entries]
+        return ParsedFeed(articles, "feedparser")
 
     def _create_article(self, entry: Any, feed_url: str) -> RssArticle:
         return RssArticle(
@@ -37,30 +387,137 @@ class FeedParser:
         return entry.get("description", "")
 
 
+class FeedCache:
+    collection = "rss_feed_cache"
+
+    def __init__(self, db: Database, target: str):
+        self._collection = db.db[self.collection]
+        self._target = db.db[target]
+        self._target_name = target
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._staged: dict[str, dict[str, Any]] = {}
+
+    async def load(self, urls: list[str]) -> None:
+        if await self._target.find_one({}) is None:
+            self._entries = {}
+            return
+        cursor = self._collection.find({"_id": {"$in": [self._key(url) for url in urls]}})
+        self._entries = {doc["url"]: doc async for doc in cursor}
+
+    def headers(self, url: str) -> dict[str, str]:
+        entry = self._entries.get(url, {})
+        headers = {}
+        if etag := entry.get("etag"):
+            headers["If-None-Match"] = etag
+        if last_modified := entry.get("last_modified"):
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def is_unchanged(self, url: str, content_hash: str) -> bool:
+        return self._entries.get(url, {}).get("content_hash") == content_hash
+
+    def stage(self, url: str, response: HttpResponse, content_hash: str) -> None:
+        self._staged[url] = {
+            "collection": self._target_name,
+            "url": url,
+            "etag": response.etag,
+            "last_modified": response.last_modified,
+            "content_hash": content_hash,
+            "fetched_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        }
+
+    async def commit(self) -> None:
+        if not self._staged:
+            return
+        await self._collection.bulk_write(
+            [
+                UpdateOne({"_id": self._key(url)}, {"$set": entry}, upsert=True)
+                for url, entry in self._staged.items()
+            ],
+            ordered=False,
+        )
+        self._staged.clear()
+
+    def _key(self, url: str) -> str:
+        return f"{self._target_name}:{url}"
+
+
 class RssCrawler(Crawler):
-    def __init__(self, urls: list[str], database: str, collection: str):
+    def __init__(
+        self, urls: list[str], database: str, collection: str, use_cache: bool = True
+    ):
         super().__init__(database, collection)
         self._urls = urls
-        self._http = HttpClient(user_agent="Mozilla/5.0 (compatible; RSS Reader/1.0)")
+        self._use_cache = use_cache
+        self._cache: Optional[FeedCache] = None
+        settings = get_settings()
+        self._http = AsyncHttpClient(
+            timeout=settings.http_timeout,
+            user_agent="Mozilla/5.0 (compatible; RSS Reader/1.0)",
+            max_connections=settings.http_max_connections,
+            max_per_host=settings.http_max_per_host,
+            http2=settings.http2,
+            health=create_host_health_tracker(),
+            retry=RetryPolicy.from_settings(),
+        )
         self._parser = FeedParser()
 
-    def crawl(self) -> list[dict]:
+    async def execute(self, db: Database) -> dict[str, Any]:
+        if self._use_cache:
+            self._cache = FeedCache(db, self._collection)
+            await self._cache.load(self._urls)
+        await self._http.health.load(db, self._hosts())
+        result = await super().execute(db)
+        if self._cache and result["success"]:
+            await self._cache.commit()
+        try:
+            await self._http.health.save(db)
+        except Exception as e:
+            self._logger.warning(f"Failed to save host health: {e}")
+        return result
+
+    async def crawl(self) -> AsyncIterator[dict]:
+        tasks = [asyncio.create_task(self._crawl_feed(url)) for url in self._urls]
         try:
-            articles = [
-                article
-                for url in self._urls
-                for article in self._crawl_feed(url)
-            ]
-            return articles
+            for feed in asyncio.as_completed(tasks):
+                for article in await feed:
+                    yield article
         finally:
-            self._http.close()
+            for task in tasks:
+                task.cancel()
+            await self._http.close()
 
-    def _crawl_feed(self, url: str) -> list[dict]:
+    async def _crawl_feed(self, url: str) -> list[dict]:
         try:
-            content = self._http.get(url)
-            articles = self._parser.parse(content, url)
-            self._logger.info(f"Crawled {len(articles)} articles from {url}")
-            return [article.to_dict() for article in articles]
+            headers = self._cache.headers(url) if self._cache else None
+            with self._stage("fetch").time():
+                response = await self._http.fetch(url, headers)
+            BYTES_IN.labels(self._name).inc(len(response.content))
+            if response.not_modified:
+                self._logger.info(f"Not modified: {url}")
+                return []
+            content_hash = hashlib.sha256(response.content).hexdigest()
+            if self._cache and self._cache.is_unchanged(url, content_hash):
+                self._logger.info(f"Unchanged: {url}")
+                return []
+            parsed = await self.executor.run_cpu(self._parse, response.content, url)
+            FEEDS_PARSED.labels(parsed.parser).inc()
+            self._logger.info(
+                f"Crawled {len(parsed.articles)} articles from {url} with {parsed.parser}"
+            )
+            if self._cache:
+                self._cache.stage(url, response, content_hash)
+            return [article.to_dict() for article in parsed.articles]
+        except CircuitOpenError as e:
+            self._logger.info(f"Skipping {url}: {e}")
+            return []
         except Exception as e:
             self._logger.warning(f"Failed to crawl {url}: {type(e).__name__}")
             return []
+
+    def _hosts(self) -> list[str]:
+        return list({urlsplit(url).hostname or "" for url in self._urls})
+
+    def _parse(self, content: bytes, url: str) -> ParsedFeed:
+        with self._stage("parse").time():
+            return self._parser.parse(content, url)
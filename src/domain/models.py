@@ -1,7 +1,16 @@
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from typing import Any
 
 
+@dataclass
+class Attachment:
+    filename: str
+    content_type: str
+    size: int
+    inline: bool = False
+    content_id: str = ""
+
+
 @dataclass
 class Email:
     message_id: str
@@ -11,6 +20,9 @@ class Email:
     date: str
     text_body: str
     html_body: str
+    size: int = 0
+    attachments: list[Attachment] = field(default_factory=list)
+    truncated: bool = False
 
     def to_dict(self) -> dict[str, Any]:
         data = asdict(self)
@@ -33,3 +45,14 @@ class RssArticle:
         data = asdict(self)
         data["_id"] = f"{self.feed_url}:{self.link}"
         return data
+
+
+@dataclass
+class CrawlProgress:
+    fetched: int = 0
+    saved: int = 0
+    errors: int = 0
+    queued: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
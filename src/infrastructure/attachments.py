@@ -0,0 +1,79 @@
+import hashlib
+import threading
+from typing import Any, Callable, Iterator
+
+from gridfs import GridFSBucket
+from pymongo.database import Database as SyncDatabase
+from pymongo.errors import DuplicateKeyError
+
+from src.infrastructure.logger import setup_logger
+
+
+logger = setup_logger(__name__)
+
+ChunkSource = Callable[[], Iterator[bytes]]
+
+
+class AttachmentStore:
+    def __init__(self, db: SyncDatabase, bucket: str):
+        self._bucket = GridFSBucket(db, bucket_name=bucket)
+        self._files = db[f"{bucket}.files"]
+        self._indexed = False
+        self._lock = threading.Lock()
+
+    def save(self, chunks: ChunkSource, filename: str, content_type: str) -> dict[str, Any]:
+        digest, size = self._digest(chunks())
+        self._ensure_index()
+        file_id = self._find(digest)
+        if file_id is None:
+            file_id = self._upload(chunks, digest, filename, content_type)
+        return {
+            "filename": filename,
+            "content_type": content_type,
+            "size": size,
+            "sha256": digest,
+            "file_id": file_id,
+        }
+
+    def _upload(
+        self, chunks: ChunkSource, digest: str, filename: str, content_type: str
+    ) -> Any:
+        stream = self._bucket.open_upload_stream(
+            filename, metadata={"sha256": digest, "content_type": content_type}
+        )
+        try:
+            for chunk in chunks():
+                stream.write(chunk)
+            stream.close()
+            return stream._id
+        except DuplicateKeyError:
+            stream.abort()
+            logger.info(f"Attachment {digest[:12]} stored concurrently, reusing it")
+            return self._find(digest)
+        except Exception:
+            stream.abort()
+            raise
+
+    def _find(self, digest: str) -> Any:
+        doc = self._files.find_one({"metadata.sha256": digest}, {"_id": 1})
+        return doc["_id"] if doc else None
+
+    def _ensure_index(self) -> None:
+        with self._lock:
+            if self._indexed:
+                return
+            self._files.create_index(
+                "metadata.sha256",
+                unique=True,
+                partialFilterExpression={"metadata.sha256": {"$exists": True}},
+            )
+            self._indexed = True
+
+    @staticmethod
+    def _digest(chunks: Iterator[bytes]) -> tuple[str, int]:
+        sha256 = hashlib.sha256()
+        size = 0
+        for chunk in chunks:
+            sha256.update(chunk)
+            size += len(chunk)
+        return sha256.hexdigest(), size
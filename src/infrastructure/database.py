@@ -1,17 +1,285 @@
-from typing import Any
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field, asdict
+from functools import lru_cache
+from typing import Any, Callable, Optional
 
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from bson import encode, json_util
+from motor.motor_asyncio import (
+    AsyncIOMotorClient,
+    AsyncIOMotorCollection,
+    AsyncIOMotorDatabase,
+)
+from pymongo import MongoClient
+from pymongo.errors import BulkWriteError, PyMongoError
 
+from src.config.settings import Settings, get_settings
 from src.infrastructure.logger import setup_logger
 
 
 logger = setup_logger(__name__)
 
+STATE_COLLECTION = "crawler_state"
+CRAWL_FIELD = "_crawl"
+
+
+@dataclass
+class BatchResult:
+    index: int
+    size: int
+    upserted: int = 0
+    modified: int = 0
+    matched: int = 0
+    deleted: int = 0
+    errors: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class BulkWriteStats:
+    batches: list[BatchResult] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def upserted(self) -> int:
+        return sum(batch.upserted for batch in self.batches)
+
+    @property
+    def modified(self) -> int:
+        return sum(batch.modified for batch in self.batches)
+
+    @property
+    def deleted(self) -> int:
+        return sum(batch.deleted for batch in self.batches)
+
+    @property
+    def errors(self) -> int:
+        return sum(batch.errors for batch in self.batches)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "inserted": self.upserted,
+            "updated": self.modified,
+            "unchanged": self.unchanged,
+            "deleted": self.deleted,
+            "errors": self.errors,
+            "batches": [
+                batch.to_dict()
+                for batch in sorted(self.batches, key=lambda b: b.index)
+            ],
+        }
+
+
+def from_extended_json(value: Any) -> Any:
+    return json_util.loads(json.dumps(value))
+
+
+def crawl_content(doc: dict[str, Any]) -> dict[str, Any]:
+    return {k: v for k, v in doc.items() if k not in ("_id", CRAWL_FIELD)}
+
+
+def fingerprint(doc: dict[str, Any]) -> tuple[str, int]:
+    encoded = encode(doc)
+    return hashlib.sha256(encoded).hexdigest(), len(encoded)
+
+
+class BulkWriter:
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection,
+        batch_size: int,
+        batch_bytes: int,
+        max_in_flight: int,
+        on_batch: Optional[Callable[[BatchResult], None]] = None,
+    ):
+        self._collection = collection
+        self._batch_size = batch_size
+        self._batch_bytes = batch_bytes
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._in_flight: set[asyncio.Task] = set()
+        self._ops: list[Any] = []
+        self._bytes = 0
+        self._dispatched = 0
+        self._on_batch = on_batch
+        self.stats = BulkWriteStats()
+
+    async def __aenter__(self) -> "BulkWriter":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.flush()
+
+    async def add(self, op: Any, size: int) -> None:
+        if self._ops and self._bytes + size > self._batch_bytes:
+            await self._dispatch()
+        self._ops.append(op)
+        self._bytes += size
+        if len(self._ops) >= self._batch_size:
+            await self._dispatch()
+
+    def skip(self, count: int = 1) -> None:
+        self.stats.unchanged += count
+
+    async def stored_hashes(self, ids: list[Any]) -> dict[Any, str]:
+        stored = await self.stored_meta(ids)
+        return {doc_id: meta.get("hash") for doc_id, meta in stored.items()}
+
+    async def stored_meta(self, ids: list[Any]) -> dict[Any, dict[str, Any]]:
+        try:
+            cursor = self._collection.find({"_id": {"$in": ids}}, {CRAWL_FIELD: 1})
+            return {doc["_id"]: doc.get(CRAWL_FIELD) or {} async for doc in cursor}
+        except PyMongoError as e:
+            logger.warning(f"Hash lookup failed, writing all: {self._collection.name}, error={e}")
+            return {}
+
+    async def flush(self) -> BulkWriteStats:
+        if self._ops:
+            await self._dispatch()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight)
+        return self.stats
+
+    async def _dispatch(self) -> None:
+        ops, size, self._ops, self._bytes = self._ops, self._bytes, [], 0
+        await self._slots.acquire()
+        task = asyncio.create_task(self._write(self._dispatched, ops, size))
+        self._dispatched += 1
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _write(self, index: int, ops: list[Any], size: int) -> None:
+        result = BatchResult(index=index, size=len(ops), bytes=size)
+        start = time.perf_counter()
+        try:
+            res = await self._collection.bulk_write(ops, ordered=False)
+            result.upserted = res.upserted_count
+            result.modified = res.modified_count
+            result.matched = res.matched_count
+            result.deleted = res.deleted_count
+        except BulkWriteError as e:
+            details = e.details
+            result.upserted = details.get("nUpserted", 0)
+            result.modified = details.get("nModified", 0)
+            result.matched = details.get("nMatched", 0)
+            result.deleted = details.get("nRemoved", 0)
+            result.errors = len(details.get("writeErrors", []))
+            logger.error(
+                f"Bulk write partially failed: {self._collection.name}, "
+                f"batch={index}, errors={result.errors}"
+            )
+        except PyMongoError as e:
+            result.errors = len(ops)
+            logger.error(
+                f"Bulk write failed: {self._collection.name}, batch={index}, error={e}"
+            )
+        finally:
+            self._slots.release()
+            result.seconds = round(time.perf_counter() - start, 4)
+        self.stats.batches.append(result)
+        if self._on_batch:
+            self._on_batch(result)
+
+
+class MongoClients:
+    def __init__(self, settings: Settings):
+        self._pool_options = {
+            "maxPoolSize": settings.mongo_max_pool_size,
+            "minPoolSize": settings.mongo_min_pool_size,
+            "maxIdleTimeMS": settings.mongo_max_idle_time_ms,
+            "maxConnecting": settings.mongo_max_connecting,
+        }
+        self._max_idle_sources = settings.mongo_source_max_idle_clients
+        self._source_idle_seconds = settings.mongo_source_idle_seconds
+        self._clients: dict[tuple, AsyncIOMotorClient] = {}
+        self._sources: OrderedDict[tuple, MongoClient] = OrderedDict()
+        self._source_users: Counter[tuple] = Counter()
+        self._source_released: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def get_async(self, uri: str, **options: Any) -> AsyncIOMotorClient:
+        key = self._key(uri, options)
+        with self._lock:
+            if key not in self._clients:
+                logger.info("Creating AsyncIOMotorClient pool")
+                self._clients[key] = AsyncIOMotorClient(uri, **{**self._pool_options, **options})
+            return self._clients[key]
+
+    def acquire_sync(self, uri: str, **options: Any) -> MongoClient:
+        key = self._key(uri, options)
+        with self._lock:
+            if key not in self._sources:
+                logger.info("Creating MongoClient pool")
+                self._sources[key] = MongoClient(uri, **{**self._pool_options, **options})
+            self._sources.move_to_end(key)
+            self._source_users[key] += 1
+            self._source_released.pop(key, None)
+            client = self._sources[key]
+            evicted = self._evict_sources()
+        for idle in evicted:
+            idle.close()
+        return client
+
+    def release_sync(self, uri: str, **options: Any) -> None:
+        key = self._key(uri, options)
+        with self._lock:
+            self._source_users[key] -= 1
+            if self._source_users[key] <= 0:
+                del self._source_users[key]
+                self._source_released[key] = time.monotonic()
+            evicted = self._evict_sources()
+        for client in evicted:
+            client.close()
+
+    def _evict_sources(self) -> list[MongoClient]:
+        idle = [key for key in self._sources if key not in self._source_users]
+        cutoff = time.monotonic() - self._source_idle_seconds
+        expired = [key for key in idle if self._source_released.get(key, 0) < cutoff]
+        overflow = [key for key in idle if key not in expired]
+        overflow = overflow[: max(0, len(overflow) - self._max_idle_sources)]
+        evicted = []
+        for key in expired + overflow:
+            self._source_released.pop(key, None)
+            evicted.append(self._sources.pop(key))
+        if evicted:
+            logger.info(f"Closing {len(evicted)} idle MongoClient pools")
+        return evicted
+
+    @staticmethod
+    def _key(uri: str, options: dict[str, Any]) -> tuple:
+        return uri, tuple(sorted(options.items()))
+
+    def close(self) -> None:
+        with self._lock:
+            clients = list(self._clients.values()) + list(self._sources.values())
+            self._clients, self._sources = {}, OrderedDict()
+            self._source_users.clear()
+            self._source_released.clear()
+        for client in clients:
+            client.close()
+
+
+@lru_cache
+def get_mongo_clients() -> MongoClients:
+    return MongoClients(get_settings())
+
+
+def close_mongo_clients() -> None:
+    if get_mongo_clients.cache_info().currsize:
+        get_mongo_clients().close()
+        get_mongo_clients.cache_clear()
+
 
 class Database:
-    def __init__(self, uri: str, database: str):
-        self._client = AsyncIOMotorClient(uri)
-        self._db: AsyncIOMotorDatabase = self._client[database]
+    def __init__(self, client: AsyncIOMotorClient, database: str):
+        self._db: AsyncIOMotorDatabase = client[database]
 
     @property
     def db(self) -> AsyncIOMotorDatabase:
@@ -28,5 +296,27 @@ class Database:
             logger.error(f"Upsert failed: {collection}, id={filter_doc.get('_id')}, error={e}")
             raise
 
-    def close(self) -> None:
-        self._client.close()
+    async def load_state(self, key: str) -> Optional[dict[str, Any]]:
+        return await self._db[STATE_COLLECTION].find_one({"_id": key})
+
+    async def save_state(self, key: str, state: dict[str, Any]) -> None:
+        await self._db[STATE_COLLECTION].update_one(
+            {"_id": key}, {"$set": state}, upsert=True
+        )
+
+    async def clear_state(self, key: str) -> None:
+        await self._db[STATE_COLLECTION].delete_one({"_id": key})
+
+    def bulk_writer(
+        self,
+        collection: str,
+        on_batch: Optional[Callable[[BatchResult], None]] = None,
+    ) -> BulkWriter:
+        settings = get_settings()
+        return BulkWriter(
+            self._db[collection],
+            batch_size=settings.write_batch_size,
+            batch_bytes=settings.write_batch_bytes,
+            max_in_flight=settings.write_max_in_flight,
+            on_batch=on_batch,
+        )
@@ -0,0 +1,85 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache, partial
+from typing import Any, Callable, Optional, TypeVar
+
+from src.config.settings import get_settings
+from src.infrastructure.logger import setup_logger
+
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+
+class Executor:
+    def __init__(self, io_workers: int, cpu_workers: int, process_workers: int = 0):
+        self._io = ThreadPoolExecutor(
+            max_workers=io_workers, thread_name_prefix="crawler-io"
+        )
+        self._cpu = ThreadPoolExecutor(
+            max_workers=cpu_workers, thread_name_prefix="crawler-cpu"
+        )
+        self._process_workers = process_workers
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def process_workers(self) -> int:
+        return self._process_workers
+
+    async def run_io(self, fn: Callable[..., T], *args: Any) -> T:
+        return await self._run(self._io, fn, *args)
+
+    async def run_cpu(self, fn: Callable[..., T], *args: Any) -> T:
+        return await self._run(self._cpu, fn, *args)
+
+    def submit_process(self, fn: Callable[..., T], *args: Any) -> Future:
+        if not self._process_workers:
+            return self._cpu.submit(fn, *args)
+        pool = self._process_pool()
+        try:
+            return pool.submit(fn, *args)
+        except BrokenProcessPool:
+            logger.warning("Process pool broken, restarting it")
+            with self._lock:
+                if self._processes is pool:
+                    self._processes = None
+            return self._cpu.submit(fn, *args)
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._processes is None:
+                methods = multiprocessing.get_all_start_methods()
+                context = "forkserver" if "forkserver" in methods else "spawn"
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self._process_workers,
+                    mp_context=multiprocessing.get_context(context),
+                )
+            return self._processes
+
+    @staticmethod
+    async def _run(pool: ThreadPoolExecutor, fn: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, partial(fn, *args))
+
+    def shutdown(self) -> None:
+        self._io.shutdown(wait=False, cancel_futures=True)
+        self._cpu.shutdown(wait=False, cancel_futures=True)
+        if self._processes:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache
+def get_executor() -> Executor:
+    settings = get_settings()
+    return Executor(settings.io_workers, settings.cpu_workers, settings.parse_workers)
+
+
+def shutdown_executor() -> None:
+    if get_executor.cache_info().currsize:
+        get_executor().shutdown()
+        get_executor.cache_clear()
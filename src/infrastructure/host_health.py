@@ -0,0 +1,167 @@
+import random
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from pymongo import UpdateOne
+
+from src.config.settings import get_settings
+from src.infrastructure.database import Database
+from src.infrastructure.logger import setup_logger
+
+
+logger = setup_logger(__name__)
+
+HEALTH_COLLECTION = "http_host_health"
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, host: str, retry_at: float):
+        super().__init__(f"Circuit open for {host} for another {retry_at - time.time():.0f}s")
+        self.host = host
+        self.retry_at = retry_at
+
+
+@dataclass
+class HostHealth:
+    host: str
+    latencies: list[float] = field(default_factory=list)
+    failures: int = 0
+    trips: int = 0
+    open_until: float = 0.0
+    probing: bool = False
+
+    def percentile(self, percent: int) -> Optional[float]:
+        if not self.latencies:
+            return None
+        if len(self.latencies) == 1:
+            return self.latencies[0]
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[percent - 1]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "latencies": self.latencies,
+            "failures": self.failures,
+            "trips": self.trips,
+            "open_until": self.open_until,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+        }
+
+    @classmethod
+    def from_dict(cls, host: str, data: dict[str, Any]) -> "HostHealth":
+        return cls(
+            host=host,
+            latencies=list(data.get("latencies", [])),
+            failures=data.get("failures", 0),
+            trips=data.get("trips", 0),
+            open_until=data.get("open_until", 0.0),
+        )
+
+
+class HostHealthTracker:
+    _min_samples = 10
+
+    def __init__(
+        self,
+        timeout: float,
+        connect_timeout: float,
+        min_timeout: float,
+        timeout_multiplier: float,
+        failure_threshold: int,
+        cooldown_seconds: float,
+        max_cooldown_seconds: float,
+        samples: int = 50,
+    ):
+        self._timeout = timeout
+        self._connect_timeout = connect_timeout
+        self._min_timeout = min_timeout
+        self._multiplier = timeout_multiplier
+        self._threshold = failure_threshold
+        self._cooldown = cooldown_seconds
+        self._max_cooldown = max_cooldown_seconds
+        self._samples = samples
+        self._hosts: dict[str, HostHealth] = {}
+        self._touched: set[str] = set()
+
+    def timeouts(self, host: str) -> tuple[float, float]:
+        health = self._host(host)
+        if len(health.latencies) < self._min_samples:
+            return min(self._connect_timeout, self._timeout), self._timeout
+        p50, p95 = health.percentile(50), health.percentile(95)
+        read = self._clamp(p95 * self._multiplier, self._timeout)
+        connect = self._clamp(p50 * self._multiplier, min(self._connect_timeout, read))
+        return connect, read
+
+    def allow(self, host: str) -> None:
+        health = self._host(host)
+        if not health.open_until:
+            return
+        if time.time() < health.open_until or health.probing:
+            raise CircuitOpenError(host, health.open_until)
+        health.probing = True
+        logger.info(f"Circuit for {host} half-open, sending a probe request")
+
+    def record_success(self, host: str, seconds: float) -> None:
+        health = self._host(host)
+        if health.open_until:
+            logger.info(f"Circuit for {host} closed")
+        health.latencies = (health.latencies + [round(seconds, 4)])[-self._samples :]
+        health.failures = 0
+        health.trips = 0
+        health.open_until = 0.0
+        health.probing = False
+        self._touched.add(host)
+
+    def record_failure(self, host: str) -> None:
+        health = self._host(host)
+        health.failures += 1
+        self._touched.add(host)
+        if not health.probing and health.failures < self._threshold:
+            return
+        health.trips += 1
+        cooldown = min(self._max_cooldown, self._cooldown * 2 ** (health.trips - 1))
+        cooldown *= random.uniform(0.8, 1.2)
+        health.open_until = time.time() + cooldown
+        health.probing = False
+        logger.warning(
+            f"Circuit opened for {host} after {health.failures} failures, "
+            f"cooling down for {cooldown:.0f}s"
+        )
+
+    async def load(self, db: Database, hosts: list[str]) -> None:
+        cursor = db.db[HEALTH_COLLECTION].find({"_id": {"$in": hosts}})
+        async for doc in cursor:
+            self._hosts.setdefault(doc["_id"], HostHealth.from_dict(doc["_id"], doc))
+
+    async def save(self, db: Database) -> None:
+        updates = [
+            UpdateOne({"_id": host}, {"$set": self._hosts[host].to_dict()}, upsert=True)
+            for host in self._touched
+        ]
+        self._touched.clear()
+        if updates:
+            await db.db[HEALTH_COLLECTION].bulk_write(updates, ordered=False)
+
+    def _host(self, host: str) -> HostHealth:
+        health = self._hosts.get(host)
+        if health is None:
+            health = self._hosts[host] = HostHealth(host)
+        return health
+
+    def _clamp(self, value: float, ceiling: float) -> float:
+        return max(self._min_timeout, min(value, ceiling))
+
+
+def create_host_health_tracker() -> HostHealthTracker:
+    settings = get_settings()
+    return HostHealthTracker(
+        timeout=settings.http_timeout,
+        connect_timeout=settings.http_connect_timeout,
+        min_timeout=settings.http_min_timeout,
+        timeout_multiplier=settings.http_timeout_multiplier,
+        failure_threshold=settings.http_breaker_failures,
+        cooldown_seconds=settings.http_breaker_cooldown_seconds,
+        max_cooldown_seconds=settings.http_breaker_max_cooldown_seconds,
+    )
@@ -1,33 +1,196 @@
-import requests
-from requests.exceptions import RequestException, Timeout, HTTPError
+import asyncio
+import importlib.util
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Optional
 
+import httpx
+
+from src.config.settings import get_settings
+from src.infrastructure.host_health import HostHealthTracker
 from src.infrastructure.logger import setup_logger
+from src.infrastructure.metrics import HTTP_RETRIES, HTTP_SECONDS
 
 
 logger = setup_logger(__name__)
 
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        retries: int = 0,
+        base_seconds: float = 0.5,
+        max_seconds: float = 10,
+        budget_ratio: float = 0.2,
+        min_budget: int = 3,
+    ):
+        self._retries = retries
+        self._base = base_seconds
+        self._max = max_seconds
+        self._budget_ratio = budget_ratio
+        self._min_budget = min_budget
+        self._requests = 0
+        self._spent = 0
+
+    @classmethod
+    def from_settings(cls) -> "RetryPolicy":
+        settings = get_settings()
+        return cls(
+            retries=settings.http_retries,
+            base_seconds=settings.http_retry_base_seconds,
+            max_seconds=settings.http_retry_max_seconds,
+            budget_ratio=settings.http_retry_budget_ratio,
+        )
+
+    def record_request(self) -> None:
+        self._requests += 1
+
+    def delay(self, error: Exception, attempt: int) -> Optional[float]:
+        if attempt >= self._retries or not is_retryable(error):
+            return None
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            if float(retry_after) > self._max:
+                return None
+            delay = float(retry_after)
+        else:
+            delay = random.uniform(0, min(self._max, self._base * 2**attempt))
+        return delay if self._spend() else None
+
+    def _spend(self) -> bool:
+        if self._spent >= max(self._min_budget, self._requests * self._budget_ratio):
+            return False
+        self._spent += 1
+        return True
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.TransportError):
+        return True
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code in RETRYABLE_STATUSES
+
+
+@dataclass
+class HttpResponse:
+    status: int
+    content: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+
+class AsyncHttpClient:
+    def __init__(
+        self,
+        timeout: float = 30,
+        user_agent: Optional[str] = None,
+        max_connections: int = 100,
+        max_per_host: int = 4,
+        http2: bool = False,
+        health: Optional[HostHealthTracker] = None,
+        retry: Optional[RetryPolicy] = None,
+    ):
+        headers = {"User-Agent": user_agent} if user_agent else None
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            headers=headers,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            http2=http2 and self._http2_available(),
+            follow_redirects=True,
+        )
+        self._slots = asyncio.Semaphore(max_connections)
+        self._host_slots: defaultdict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(max_per_host)
+        )
+        self._health = health
+        self._retry = retry or RetryPolicy()
+
+    @property
+    def health(self) -> Optional[HostHealthTracker]:
+        return self._health
+
+    async def get(self, url: str) -> bytes:
+        return (await self.fetch(url)).content
+
+    async def fetch(
+        self, url: str, headers: Optional[dict[str, str]] = None
+    ) -> HttpResponse:
+        host = httpx.URL(url).host
+        if self._health:
+            self._health.allow(host)
+        self._retry.record_request()
+        attempt = 0
+        while True:
+            try:
+                return await self._fetch(url, host, headers)
+            except httpx.HTTPError as e:
+                delay = self._retry.delay(e, attempt)
+                if delay is None:
+                    if self._health and is_retryable(e):
+                        self._health.record_failure(host)
+                    raise
+            attempt += 1
+            HTTP_RETRIES.labels(host).inc()
+            logger.info(f"Retrying {url} in {delay:.1f}s, attempt {attempt + 1}")
+            await asyncio.sleep(delay)
+
+    async def _fetch(
+        self, url: str, host: str, headers: Optional[dict[str, str]]
+    ) -> HttpResponse:
+        timeout = self._timeout(host)
+        async with self._host_slots[host], self._slots:
+            start = time.perf_counter()
+            status = "error"
+            try:
+                response = await self._client.get(url, headers=headers, timeout=timeout)
+                status = str(response.status_code)
+                if self._health and response.status_code not in RETRYABLE_STATUSES:
+                    self._health.record_success(host, time.perf_counter() - start)
+                if response.status_code != 304:
+                    response.raise_for_status()
+                return HttpResponse(
+                    status=response.status_code,
+                    content=response.content,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+            except httpx.TimeoutException:
+                status = "timeout"
+                logger.warning(f"Timeout fetching {url}")
+                raise
+            except httpx.HTTPStatusError as e:
+                logger.warning(f"HTTP error {e.response.status_code} for {url}")
+                raise
+            except httpx.HTTPError as e:
+                logger.warning(f"Request failed for {url}: {e}")
+                raise
+            finally:
+                HTTP_SECONDS.labels(host, status).observe(time.perf_counter() - start)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    def _timeout(self, host: str):
+        if not self._health:
+            return httpx.USE_CLIENT_DEFAULT
+        connect, read = self._health.timeouts(host)
+        return httpx.Timeout(read, connect=connect)
 
-class HttpClient:
-    def __init__(self, timeout: int = 30, user_agent: str = None):
-        self._session = requests.Session()
-        self._timeout = timeout
-        if user_agent:
-            self._session.headers["User-Agent"] = user_agent
-
-    def get(self, url: str) -> str:
-        try:
-            response = self._session.get(url, timeout=self._timeout)
-            response.raise_for_status()
-            return response.text
-        except Timeout:
-            logger.warning(f"Timeout fetching {url}")
-            raise
-        except HTTPError as e:
-            logger.warning(f"HTTP error {e.response.status_code} for {url}")
-            raise
-        except RequestException as e:
-            logger.warning(f"Request failed for {url}: {e}")
-            raise
-
-    def close(self) -> None:
-        self._session.close()
+    @staticmethod
+    def _http2_available() -> bool:
+        if importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but h2 is not installed, using HTTP/1.1")
+            return False
+        return True
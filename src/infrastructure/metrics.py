@@ -0,0 +1,232 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator
+
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60,
+)
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], "MetricChild"] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> "MetricChild":
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for key, child in sorted(self._children.items()):
+            lines.extend(child.render(self.name, self._format_labels(key)))
+        return lines
+
+    @abstractmethod
+    def _new_child(self) -> "MetricChild":
+        pass
+
+    def _format_labels(self, values: tuple[str, ...]) -> str:
+        return ",".join(
+            f'{name}="{self._escape(value)}"'
+            for name, value in zip(self.labelnames, values)
+        )
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricChild(ABC):
+    @abstractmethod
+    def render(self, name: str, labels: str) -> list[str]:
+        pass
+
+    @staticmethod
+    def _series(name: str, labels: str, value: float) -> str:
+        return f"{name}{{{labels}}} {value}" if labels else f"{name} {value}"
+
+
+class CounterChild(MetricChild):
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def render(self, name: str, labels: str) -> list[str]:
+        return [self._series(name, labels, self._value)]
+
+
+class GaugeChild(MetricChild):
+    def __init__(self):
+        self._value = 0.0
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def render(self, name: str, labels: str) -> list[str]:
+        return [self._series(name, labels, self._value)]
+
+
+class HistogramChild(MetricChild):
+    def __init__(self, buckets: tuple[float, ...]):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def render(self, name: str, labels: str) -> list[str]:
+        prefix = f"{labels}," if labels else ""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self._buckets + (float("inf"),), self._counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(float(bound))
+            lines.append(f'{name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+        lines.append(self._series(f"{name}_sum", labels, self._sum))
+        lines.append(self._series(f"{name}_count", labels, cumulative))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self._buckets)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...]) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...]) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: tuple[str, ...]
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+
+@lru_cache
+def get_metrics() -> MetricsRegistry:
+    return MetricsRegistry()
+
+
+STAGE_SECONDS = get_metrics().histogram(
+    "crawler_stage_seconds",
+    "Time spent per crawler stage (fetch, parse, save)",
+    ("crawler", "stage"),
+)
+ITEMS = get_metrics().counter(
+    "crawler_items_total",
+    "Items processed per crawler and outcome",
+    ("crawler", "outcome"),
+)
+BYTES_IN = get_metrics().counter(
+    "crawler_bytes_in_total",
+    "Bytes read from sources",
+    ("crawler",),
+)
+BYTES_OUT = get_metrics().counter(
+    "crawler_bytes_out_total",
+    "BSON bytes sent to MongoDB in bulk writes",
+    ("crawler",),
+)
+FEEDS_PARSED = get_metrics().counter(
+    "crawler_feeds_parsed_total",
+    "Feeds parsed per parser (lxml or etree streaming, feedparser fallback)",
+    ("parser",),
+)
+QUEUE_DEPTH = get_metrics().gauge(
+    "crawler_queue_depth",
+    "Items waiting between producer and writer",
+    ("crawler",),
+)
+HTTP_SECONDS = get_metrics().histogram(
+    "http_request_seconds",
+    "HTTP request latency per host",
+    ("host", "status"),
+)
+HTTP_RETRIES = get_metrics().counter(
+    "http_retries_total",
+    "HTTP requests retried per host",
+    ("host",),
+)
+MAIL_SECONDS = get_metrics().histogram(
+    "mail_round_trip_seconds",
+    "IMAP/POP3 command round-trip latency",
+    ("protocol", "command"),
+)
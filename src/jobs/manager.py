@@ -0,0 +1,192 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Optional
+
+from src.config.settings import get_settings
+from src.crawlers.base import Crawler
+from src.infrastructure.database import Database, get_mongo_clients
+from src.infrastructure.logger import setup_logger
+
+
+logger = setup_logger(__name__)
+
+
+class JobState(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    DEAD = "dead"
+
+
+class QueueFullError(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    kind: str
+    crawler: Crawler
+    mongo_uri: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    state: JobState = JobState.QUEUED
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    _started: Optional[float] = field(default=None, init=False, repr=False)
+    _finished: Optional[float] = field(default=None, init=False, repr=False)
+
+    @property
+    def throughput(self) -> float:
+        if self._started is None:
+            return 0.0
+        elapsed = (self._finished or time.monotonic()) - self._started
+        return round(self.crawler.progress.saved / elapsed, 2) if elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        progress = self.crawler.progress
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "state": self.state.value,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "fetched": progress.fetched,
+            "saved": progress.saved,
+            "errors": progress.errors,
+            "queued": progress.queued,
+            "throughput": self.throughput,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    def __init__(
+        self,
+        workers: int,
+        max_queue: int,
+        limits: dict[str, int],
+        history: int = 1000,
+    ):
+        self._workers = workers
+        self._max_queue = max_queue
+        self._pending: deque[Job] = deque()
+        self._limits = limits
+        self._running: defaultdict[str, int] = defaultdict(int)
+        self._wakeup = asyncio.Event()
+        self._history = history
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._work(), name=f"job-worker-{i}")
+                for i in range(self._workers)
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job in self._jobs.values():
+            if job.state in (JobState.QUEUED, JobState.RUNNING):
+                job.state = JobState.CANCELLED
+
+    def submit(self, kind: str, crawler: Crawler, mongo_uri: str) -> Job:
+        if len(self._pending) >= self._max_queue:
+            raise QueueFullError(f"Job queue is full ({self._max_queue})")
+        job = Job(kind=kind, crawler=crawler, mongo_uri=mongo_uri)
+        self._pending.append(job)
+        self._wakeup.set()
+        self._remember(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def _remember(self, job: Job) -> None:
+        self._jobs[job.id] = job
+        while len(self._jobs) > self._history:
+            oldest = next(iter(self._jobs.values()))
+            if oldest.state in (JobState.QUEUED, JobState.RUNNING):
+                break
+            self._jobs.popitem(last=False)
+
+    async def _work(self) -> None:
+        while True:
+            job = self._claim()
+            if job is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            try:
+                await self._run(job)
+            finally:
+                self._running[job.kind] -= 1
+                self._wakeup.set()
+
+    def _claim(self) -> Optional[Job]:
+        for index, job in enumerate(self._pending):
+            limit = self._limits.get(job.kind)
+            if limit is None or self._running[job.kind] < limit:
+                del self._pending[index]
+                self._running[job.kind] += 1
+                return job
+        return None
+
+    async def _run(self, job: Job) -> None:
+        crawler_name = job.crawler.__class__.__name__
+        logger.info(f"Starting {crawler_name} job {job.id}")
+        job.state = JobState.RUNNING
+        job.started_at = datetime.now(timezone.utc)
+        job._started = time.monotonic()
+        try:
+            client = get_mongo_clients().get_async(job.mongo_uri)
+            db = Database(client, job.crawler.database)
+            job.result = await job.crawler.execute(db)
+            job.state = JobState.SUCCEEDED if job.result.get("success") else JobState.FAILED
+            logger.info(f"{crawler_name} job {job.id} completed: {job.result}")
+        except asyncio.CancelledError:
+            job.state = JobState.CANCELLED
+            raise
+        except Exception as e:
+            job.state = JobState.FAILED
+            job.error = f"{type(e).__name__}: {e}"
+            logger.error(f"{crawler_name} job {job.id} failed: {e}", exc_info=True)
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            job._finished = time.monotonic()
+
+
+@lru_cache
+def get_job_manager() -> JobManager:
+    settings = get_settings()
+    return JobManager(
+        workers=settings.job_workers,
+        max_queue=settings.job_queue_size,
+        limits={
+            "mail": settings.job_limit_mail,
+            "rss": settings.job_limit_rss,
+            "mongo": settings.job_limit_mongo,
+        },
+        history=settings.job_history,
+    )
+
+
+async def stop_job_manager() -> None:
+    if get_job_manager.cache_info().currsize:
+        await get_job_manager().stop()
+        get_job_manager.cache_clear()
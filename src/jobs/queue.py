@@ -0,0 +1,381 @@
+import asyncio
+import os
+import random
+import socket
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ASCENDING, ReturnDocument
+
+from src.api.factory import build_crawler_from_dict
+from src.config.settings import get_settings
+from src.infrastructure.database import Database, get_mongo_clients
+from src.infrastructure.logger import setup_logger
+from src.jobs.manager import Job, JobState, QueueFullError
+
+
+logger = setup_logger(__name__)
+
+JOB_COLLECTION = "crawl_jobs"
+
+
+class LeaseLostError(Exception):
+    pass
+
+
+class JobQueue:
+    def __init__(
+        self,
+        mongo_uri: str,
+        database: str,
+        workers: int,
+        max_queue: int,
+        limits: dict[str, int],
+        lease_seconds: float,
+        heartbeat_seconds: float,
+        poll_seconds: float,
+        max_attempts: int,
+        retry_base_seconds: float,
+        retry_max_seconds: float,
+    ):
+        self._mongo_uri = mongo_uri
+        self._database = database
+        self._workers = workers
+        self._max_queue = max_queue
+        self._limits = limits
+        self._lease = lease_seconds
+        self._heartbeat = heartbeat_seconds
+        self._poll = poll_seconds
+        self._max_attempts = max_attempts
+        self._retry_base = retry_base_seconds
+        self._retry_max = retry_max_seconds
+        self._owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._running: defaultdict[str, int] = defaultdict(int)
+        self._active: dict[str, Job] = {}
+        self._claim_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def owner(self) -> str:
+        return self._owner
+
+    @property
+    def collection(self) -> AsyncIOMotorCollection:
+        client = get_mongo_clients().get_async(self._mongo_uri)
+        return client[self._database][JOB_COLLECTION]
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        await self._ensure_indexes()
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"queue-worker-{i}")
+            for i in range(self._workers)
+        ]
+        logger.info(f"Job queue worker {self._owner} started with {self._workers} slots")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def enqueue(self, kind: str, request: dict[str, Any], mongo_uri: str) -> str:
+        queued = await self.collection.count_documents({"state": JobState.QUEUED.value})
+        if queued >= self._max_queue:
+            raise QueueFullError(f"Job queue is full ({self._max_queue})")
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        await self.collection.insert_one(
+            {
+                "_id": job_id,
+                "kind": kind,
+                "request": request,
+                "mongo_uri": mongo_uri,
+                "state": JobState.QUEUED.value,
+                "attempts": 0,
+                "max_attempts": self._max_attempts,
+                "available_at": now,
+                "created_at": now,
+                "lease_owner": None,
+                "lease_expires_at": None,
+            }
+        )
+        self._wakeup.set()
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[dict[str, Any]]:
+        doc = await self.collection.find_one({"_id": job_id}, {"request": 0, "mongo_uri": 0})
+        if not doc:
+            return None
+        job = self._active.get(job_id)
+        progress = job.crawler.progress.to_dict() if job else doc.get("progress", {})
+        return {
+            "id": doc["_id"],
+            "kind": doc["kind"],
+            "state": doc["state"],
+            "created_at": self._datetime(doc["created_at"]),
+            "started_at": self._datetime(doc.get("started_at")),
+            "finished_at": self._datetime(doc.get("finished_at")),
+            "fetched": progress.get("fetched", 0),
+            "saved": progress.get("saved", 0),
+            "errors": progress.get("errors", 0),
+            "queued": progress.get("queued", 0),
+            "throughput": job.throughput if job else doc.get("throughput", 0.0),
+            "result": doc.get("result"),
+            "error": doc.get("error"),
+            "attempts": doc["attempts"],
+        }
+
+    async def _ensure_indexes(self) -> None:
+        await self.collection.create_index(
+            [("state", ASCENDING), ("available_at", ASCENDING)]
+        )
+        await self.collection.create_index(
+            [("state", ASCENDING), ("lease_expires_at", ASCENDING)]
+        )
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                doc = await self._claim()
+            except Exception as e:
+                logger.error(f"Job claim failed: {e}")
+                doc = None
+            if doc is None:
+                await self._idle()
+                continue
+            try:
+                await self._run(doc)
+            except Exception as e:
+                logger.error(f"Job {doc['_id']} could not be recorded, its lease will expire: {e}")
+            finally:
+                self._running[doc["kind"]] -= 1
+
+    async def _idle(self) -> None:
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), self._poll * random.uniform(0.5, 1.5))
+        except asyncio.TimeoutError:
+            pass
+
+    async def _claim(self) -> Optional[dict[str, Any]]:
+        async with self._claim_lock:
+            kinds = [kind for kind, limit in self._limits.items() if self._running[kind] < limit]
+            if not kinds:
+                return None
+            now = time.time()
+            doc = await self.collection.find_one_and_update(
+                {
+                    "kind": {"$in": kinds},
+                    "$or": [
+                        {"state": JobState.QUEUED.value, "available_at": {"$lte": now}},
+                        {"state": JobState.RUNNING.value, "lease_expires_at": {"$lt": now}},
+                    ],
+                },
+                {
+                    "$set": {
+                        "state": JobState.RUNNING.value,
+                        "lease_owner": self._owner,
+                        "lease_expires_at": now + self._lease,
+                        "started_at": now,
+                    },
+                    "$inc": {"attempts": 1},
+                },
+                sort=[("available_at", ASCENDING)],
+                return_document=ReturnDocument.AFTER,
+            )
+            if doc is not None:
+                self._running[doc["kind"]] += 1
+            return doc
+
+    async def _run(self, doc: dict[str, Any]) -> None:
+        job_id = doc["_id"]
+        if doc["attempts"] > doc["max_attempts"]:
+            logger.warning(f"Job {job_id} lease expired on its last attempt, dead-lettering")
+            await self._finish(doc, JobState.DEAD, error="Lease expired on the last attempt")
+            return
+        try:
+            crawler = build_crawler_from_dict(doc["kind"], doc["request"])
+        except Exception as e:
+            logger.error(f"Job {job_id} has an invalid request: {e}")
+            await self._finish(doc, JobState.DEAD, error=f"{type(e).__name__}: {e}")
+            return
+
+        job = Job(kind=doc["kind"], crawler=crawler, mongo_uri=doc["mongo_uri"], id=job_id)
+        job.state = JobState.RUNNING
+        job._started = time.monotonic()
+        self._active[job_id] = job
+        logger.info(f"Starting {doc['kind']} job {job_id}, attempt {doc['attempts']}")
+        try:
+            result = await self._execute(job)
+        except LeaseLostError:
+            logger.warning(f"Job {job_id} lease lost, another worker owns it now")
+            return
+        except asyncio.CancelledError:
+            await asyncio.shield(self._release(doc))
+            raise
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+            await self._retry_or_bury(doc, job, f"{type(e).__name__}: {e}")
+            return
+        finally:
+            job._finished = time.monotonic()
+            self._active.pop(job_id, None)
+
+        if result.get("success"):
+            logger.info(f"Job {job_id} completed: {result}")
+            await self._finish(doc, JobState.SUCCEEDED, job, result=result)
+        else:
+            await self._retry_or_bury(doc, job, result.get("message", "Crawl failed"), result)
+
+    async def _execute(self, job: Job) -> dict[str, Any]:
+        client = get_mongo_clients().get_async(job.mongo_uri)
+        crawl = asyncio.create_task(job.crawler.execute(Database(client, job.crawler.database)))
+        heartbeat = asyncio.create_task(self._keep_lease(job, crawl))
+        try:
+            return await crawl
+        except asyncio.CancelledError:
+            if heartbeat.done() and isinstance(heartbeat.exception(), LeaseLostError):
+                raise LeaseLostError(job.id)
+            raise
+        finally:
+            heartbeat.cancel()
+            crawl.cancel()
+            await asyncio.gather(heartbeat, crawl, return_exceptions=True)
+
+    async def _keep_lease(self, job: Job, crawl: asyncio.Task) -> None:
+        while True:
+            await asyncio.sleep(self._heartbeat)
+            try:
+                result = await self.collection.update_one(
+                    {"_id": job.id, "lease_owner": self._owner},
+                    {
+                        "$set": {
+                            "lease_expires_at": time.time() + self._lease,
+                            "progress": job.crawler.progress.to_dict(),
+                            "throughput": job.throughput,
+                        }
+                    },
+                )
+            except Exception as e:
+                logger.warning(f"Heartbeat for job {job.id} failed: {e}")
+                continue
+            if result.matched_count == 0:
+                crawl.cancel()
+                raise LeaseLostError(job.id)
+
+    async def _retry_or_bury(
+        self,
+        doc: dict[str, Any],
+        job: Job,
+        error: str,
+        result: Optional[dict[str, Any]] = None,
+    ) -> None:
+        if doc["attempts"] >= doc["max_attempts"]:
+            logger.error(f"Job {doc['_id']} dead-lettered after {doc['attempts']} attempts")
+            await self._finish(doc, JobState.DEAD, job, result=result, error=error)
+            return
+        delay = min(self._retry_max, self._retry_base * 2 ** (doc["attempts"] - 1))
+        delay *= random.uniform(0.5, 1.0)
+        logger.warning(f"Job {doc['_id']} attempt {doc['attempts']} failed, retrying in {delay:.0f}s")
+        await self._update(
+            doc,
+            {
+                "state": JobState.QUEUED.value,
+                "available_at": time.time() + delay,
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "progress": job.crawler.progress.to_dict(),
+                "result": result,
+                "error": error,
+            },
+        )
+
+    async def _finish(
+        self,
+        doc: dict[str, Any],
+        state: JobState,
+        job: Optional[Job] = None,
+        result: Optional[dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        fields = {
+            "state": state.value,
+            "finished_at": time.time(),
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "result": result,
+            "error": error,
+        }
+        if job:
+            fields["progress"] = job.crawler.progress.to_dict()
+            fields["throughput"] = job.throughput
+        await self._update(doc, fields, unset=("request", "mongo_uri"))
+
+    async def _release(self, doc: dict[str, Any]) -> None:
+        try:
+            await self.collection.update_one(
+                {"_id": doc["_id"], "lease_owner": self._owner},
+                {
+                    "$set": {
+                        "state": JobState.QUEUED.value,
+                        "available_at": time.time(),
+                        "lease_owner": None,
+                        "lease_expires_at": None,
+                    },
+                    "$inc": {"attempts": -1},
+                },
+            )
+        except Exception as e:
+            logger.warning(f"Could not release job {doc['_id']}, its lease will expire: {e}")
+
+    async def _update(
+        self, doc: dict[str, Any], fields: dict[str, Any], unset: tuple[str, ...] = ()
+    ) -> None:
+        update = {"$set": fields}
+        if unset:
+            update["$unset"] = dict.fromkeys(unset, "")
+        result = await self.collection.update_one(
+            {"_id": doc["_id"], "lease_owner": self._owner}, update
+        )
+        if result.matched_count == 0:
+            logger.warning(f"Job {doc['_id']} was taken over before it could be updated")
+
+    @staticmethod
+    def _datetime(timestamp: Optional[float]) -> Optional[datetime]:
+        return datetime.fromtimestamp(timestamp, timezone.utc) if timestamp else None
+
+
+@lru_cache
+def get_job_queue() -> JobQueue:
+    settings = get_settings()
+    return JobQueue(
+        mongo_uri=settings.mongo_uri,
+        database=settings.scheduler_database,
+        workers=settings.job_workers,
+        max_queue=settings.job_queue_size,
+        limits={
+            "mail": settings.job_limit_mail,
+            "rss": settings.job_limit_rss,
+            "mongo": settings.job_limit_mongo,
+        },
+        lease_seconds=settings.job_lease_seconds,
+        heartbeat_seconds=settings.job_heartbeat_seconds,
+        poll_seconds=settings.job_poll_seconds,
+        max_attempts=settings.job_max_attempts,
+        retry_base_seconds=settings.job_retry_base_seconds,
+        retry_max_seconds=settings.job_retry_max_seconds,
+    )
+
+
+async def stop_job_queue() -> None:
+    if get_job_queue.cache_info().currsize:
+        await get_job_queue().stop()
+        get_job_queue.cache_clear()
@@ -0,0 +1,229 @@
+import asyncio
+import random
+import time
+import uuid
+from functools import lru_cache
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import DuplicateKeyError
+
+from src.api.factory import build_crawler_from_dict
+from src.config.settings import get_settings
+from src.infrastructure.database import get_mongo_clients
+from src.infrastructure.logger import setup_logger
+from src.jobs.manager import JobManager, JobState, QueueFullError, get_job_manager
+from src.jobs.queue import JobQueue, get_job_queue
+
+
+logger = setup_logger(__name__)
+
+SCHEDULE_COLLECTION = "crawl_schedules"
+HOST_COLLECTION = "crawl_schedule_hosts"
+
+
+def source_hosts(kind: str, request: dict[str, Any]) -> set[str]:
+    if kind == "mail":
+        accounts = [request] + request.get("accounts", [])
+        return {account["server"].lower() for account in accounts}
+    if kind == "rss":
+        return {urlsplit(url).hostname or url for url in request["urls"]}
+    return {urlsplit(request["source_uri"]).hostname or request["source_uri"]}
+
+
+class Scheduler:
+    def __init__(
+        self,
+        jobs: JobManager,
+        queue: Optional[JobQueue],
+        mongo_uri: str,
+        database: str,
+        tick_seconds: float,
+        host_gap_seconds: float,
+    ):
+        self._jobs = jobs
+        self._queue = queue
+        self._mongo_uri = mongo_uri
+        self._database = database
+        self._tick_seconds = tick_seconds
+        self._host_gap = host_gap_seconds
+        self._running: dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def collection(self) -> AsyncIOMotorCollection:
+        client = get_mongo_clients().get_async(self._mongo_uri)
+        return client[self._database][SCHEDULE_COLLECTION]
+
+    @property
+    def hosts(self) -> AsyncIOMotorCollection:
+        client = get_mongo_clients().get_async(self._mongo_uri)
+        return client[self._database][HOST_COLLECTION]
+
+    async def create(
+        self,
+        kind: str,
+        request: dict[str, Any],
+        interval_seconds: int,
+        jitter_seconds: int = 0,
+        enabled: bool = True,
+    ) -> dict[str, Any]:
+        now = time.time()
+        schedule = {
+            "_id": uuid.uuid4().hex,
+            "kind": kind,
+            "request": request,
+            "interval_seconds": interval_seconds,
+            "jitter_seconds": jitter_seconds,
+            "enabled": enabled,
+            "created_at": now,
+            "next_run_at": now + random.uniform(0, interval_seconds),
+            "last_run_at": None,
+            "last_job_id": None,
+        }
+        await self.collection.insert_one(schedule)
+        return schedule
+
+    async def schedules(self) -> list[dict[str, Any]]:
+        return await self.collection.find({}).sort("created_at", 1).to_list(None)
+
+    async def delete(self, schedule_id: str) -> bool:
+        result = await self.collection.delete_one({"_id": schedule_id})
+        self._running.pop(schedule_id, None)
+        return result.deleted_count > 0
+
+    def start(self) -> None:
+        if not self._task:
+            self._task = asyncio.create_task(self._loop(), name="crawl-scheduler")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_due()
+            except Exception as e:
+                logger.error(f"Scheduler tick failed: {e}")
+            await asyncio.sleep(self._tick_seconds)
+
+    async def run_due(self) -> None:
+        now = time.time()
+        cursor = self.collection.find(
+            {"enabled": True, "next_run_at": {"$lte": now}}
+        ).sort("next_run_at", 1)
+        for schedule in await cursor.to_list(None):
+            if claimed := await self._claim(schedule, now):
+                await self._dispatch(claimed, now)
+
+    async def _claim(self, schedule: dict[str, Any], now: float) -> Optional[dict[str, Any]]:
+        return await self.collection.find_one_and_update(
+            {"_id": schedule["_id"], "enabled": True, "next_run_at": {"$lte": now}},
+            {"$set": {"next_run_at": self._next_run_at(schedule, now)}},
+        )
+
+    async def _dispatch(self, schedule: dict[str, Any], now: float) -> None:
+        schedule_id = schedule["_id"]
+        if await self._is_running(schedule):
+            logger.info(f"Schedule {schedule_id} skipped, previous run still going")
+            return
+
+        hosts = source_hosts(schedule["kind"], schedule["request"])
+        ready_at, reserved = await self._reserve_hosts(hosts, now)
+        if ready_at > now:
+            await self._defer(schedule_id, ready_at + random.uniform(0, self._tick_seconds))
+            return
+
+        try:
+            job_id = await self._submit(schedule["kind"], schedule["request"])
+        except QueueFullError:
+            logger.warning(f"Schedule {schedule_id} deferred, job queue is full")
+            await self._release_hosts(reserved, now)
+            await self._defer(schedule_id, now)
+            return
+
+        self._running[schedule_id] = job_id
+        logger.info(f"Schedule {schedule_id} started job {job_id}")
+        await self.collection.update_one(
+            {"_id": schedule_id}, {"$set": {"last_run_at": now, "last_job_id": job_id}}
+        )
+
+    async def _reserve_hosts(
+        self, hosts: set[str], now: float
+    ) -> tuple[float, list[tuple[str, Optional[dict]]]]:
+        reserved: list[tuple[str, Optional[dict]]] = []
+        for host in sorted(hosts):
+            try:
+                previous = await self.hosts.find_one_and_update(
+                    {"_id": host, "last_start": {"$lte": now - self._host_gap}},
+                    {"$set": {"last_start": now}},
+                    upsert=True,
+                )
+            except DuplicateKeyError:
+                await self._release_hosts(reserved, now)
+                doc = await self.hosts.find_one({"_id": host})
+                ready_at = (doc["last_start"] if doc else now) + self._host_gap
+                return max(ready_at, now + self._tick_seconds), []
+            reserved.append((host, previous))
+        return now, reserved
+
+    async def _release_hosts(
+        self, reserved: list[tuple[str, Optional[dict]]], now: float
+    ) -> None:
+        for host, previous in reserved:
+            if previous is None:
+                await self.hosts.delete_one({"_id": host, "last_start": now})
+            else:
+                await self.hosts.update_one(
+                    {"_id": host, "last_start": now},
+                    {"$set": {"last_start": previous["last_start"]}},
+                )
+
+    async def _defer(self, schedule_id: str, run_at: float) -> None:
+        await self.collection.update_one(
+            {"_id": schedule_id}, {"$set": {"next_run_at": run_at}}
+        )
+
+    async def _submit(self, kind: str, request: dict[str, Any]) -> str:
+        if self._queue:
+            return await self._queue.enqueue(kind, request, get_settings().mongo_uri)
+        crawler = build_crawler_from_dict(kind, request)
+        return self._jobs.submit(kind, crawler, get_settings().mongo_uri).id
+
+    async def _is_running(self, schedule: dict[str, Any]) -> bool:
+        active = (JobState.QUEUED.value, JobState.RUNNING.value)
+        if self._queue:
+            job_id = schedule.get("last_job_id")
+            job = await self._queue.get(job_id) if job_id else None
+            return bool(job and job["state"] in active)
+        job_id = self._running.get(schedule["_id"])
+        job = self._jobs.get(job_id) if job_id else None
+        return bool(job and job.state.value in active)
+
+    @staticmethod
+    def _next_run_at(schedule: dict[str, Any], now: float) -> float:
+        jitter = random.uniform(0, schedule.get("jitter_seconds", 0))
+        return now + schedule["interval_seconds"] + jitter
+
+
+@lru_cache
+def get_scheduler() -> Scheduler:
+    settings = get_settings()
+    return Scheduler(
+        jobs=get_job_manager(),
+        queue=get_job_queue() if settings.job_backend == "mongo" else None,
+        mongo_uri=settings.mongo_uri,
+        database=settings.scheduler_database,
+        tick_seconds=settings.scheduler_tick_seconds,
+        host_gap_seconds=settings.scheduler_host_gap_seconds,
+    )
+
+
+async def stop_scheduler() -> None:
+    if get_scheduler.cache_info().currsize:
+        await get_scheduler().stop()
+        get_scheduler.cache_clear()
@@ -0,0 +1,29 @@
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_job_status_endpoint(client):
+    response = client.post(
+        "/api/v1/rss/crawl",
+        json={
+            "urls": ["https://www.qbitai.com/feed"],
+            "database": "test_db",
+            "collection": "test_rss",
+        },
+    )
+    assert response.status_code == 200
+    job_id = response.json()["job_id"]
+    assert job_id
+
+    response = client.get(f"/api/v1/jobs/{job_id}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["id"] == job_id
+    assert data["kind"] == "rss"
+    assert data["state"] in {"queued", "running", "succeeded", "failed"}
+
+
+@pytest.mark.asyncio
+async def test_job_status_not_found(client):
+    response = client.get("/api/v1/jobs/missing")
+    assert response.status_code == 404
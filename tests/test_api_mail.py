@@ -47,3 +47,42 @@ async def test_api_mail_post_imap_2(client):
     }
     client = client.post("/api/v1/mail/crawl", json=test_config)
     assert client.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_api_mail_post_multi_account(client):
+    test_config = {
+        "server": "imap.exmail.qq.com",
+        "port": 993,
+        "username": "zhoum@primecapital.com.cn",
+        "password": "Gsfsj2025!",
+        "database": "test_db",
+        "collection": "test_mail",
+        "limit": 2,
+        "folders": ["INBOX", "Sent*"],
+        "accounts": [
+            {
+                "server": "pop.163.com",
+                "port": 995,
+                "username": "17306161024@163.com",
+                "password": "FHyVNNUpZjdGABGB",
+            }
+        ],
+    }
+    client = client.post("/api/v1/mail/crawl", json=test_config)
+    assert client.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_api_mail_post_no_folders(client):
+    test_config = {
+        "server": "imap.exmail.qq.com",
+        "port": 993,
+        "username": "zhoum@primecapital.com.cn",
+        "password": "Gsfsj2025!",
+        "database": "test_db",
+        "collection": "test_mail",
+        "folders": [],
+    }
+    client = client.post("/api/v1/mail/crawl", json=test_config)
+    assert client.status_code == 422
@@ -0,0 +1,12 @@
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE crawler_stage_seconds histogram" in body
+    assert "# TYPE crawler_items_total counter" in body
+    assert "# TYPE crawler_queue_depth gauge" in body
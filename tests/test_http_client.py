@@ -0,0 +1,36 @@
+import httpx
+import pytest
+
+from src.infrastructure.host_health import CircuitOpenError, HostHealthTracker
+from src.infrastructure.http import AsyncHttpClient, RetryPolicy
+
+
+def make_client(handler) -> tuple[AsyncHttpClient, HostHealthTracker]:
+    health = HostHealthTracker(30, 10, 2, 4, 3, 300, 3600)
+    client = AsyncHttpClient(health=health, retry=RetryPolicy(retries=2, base_seconds=0.01))
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client, health
+
+
+@pytest.mark.asyncio
+async def test_fetch_retries_transient_errors():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503 if len(calls) == 1 else 200, content=b"ok")
+
+    client, _ = make_client(handler)
+    response = await client.fetch("http://feeds.example/rss")
+    assert response.status == 200
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_fetch_opens_circuit_after_failures():
+    client, health = make_client(lambda request: httpx.Response(502))
+    for _ in range(3):
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.fetch("http://feeds.example/rss")
+    with pytest.raises(CircuitOpenError):
+        await client.fetch("http://feeds.example/rss")
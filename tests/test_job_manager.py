@@ -0,0 +1,32 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from src.domain.models import CrawlProgress
+from src.jobs.manager import JobManager, JobState
+
+
+class SleepCrawler:
+    database = "test_db"
+
+    def __init__(self, seconds: float):
+        self._seconds = seconds
+        self.progress = CrawlProgress()
+
+    async def execute(self, db):
+        await asyncio.sleep(self._seconds)
+        return {"success": True}
+
+
+@pytest.mark.asyncio
+async def test_saturated_kind_does_not_block_other_kinds():
+    manager = JobManager(workers=4, max_queue=10, limits={"mail": 2, "rss": 2})
+    with mock.patch("src.jobs.manager.get_mongo_clients"):
+        manager.start()
+        mail = [manager.submit("mail", SleepCrawler(0.5), "mongodb://test") for _ in range(4)]
+        rss = manager.submit("rss", SleepCrawler(0), "mongodb://test")
+        await asyncio.sleep(0.1)
+        assert rss.state is JobState.SUCCEEDED
+        assert sum(job.state is JobState.RUNNING for job in mail) == 2
+        await manager.stop()
@@ -0,0 +1,140 @@
+import email
+from email.header import Header
+from email.mime.application import MIMEApplication
+from email.mime.message import MIMEMessage
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+import pytest
+
+from src.crawlers.mail import MessageParser, TextDecoder
+
+
+def stdlib_parse(raw: bytes) -> dict:
+    msg = email.message_from_bytes(raw)
+    bodies = {"text/plain": [], "text/html": []}
+    filenames = []
+    for part in msg.walk():
+        if part.is_multipart():
+            continue
+        content_type = part.get_content_type()
+        if content_type in bodies and part.get_content_disposition() != "attachment":
+            payload = part.get_payload(decode=True)
+            if payload:
+                charset = part.get_content_charset() or "utf-8"
+                bodies[content_type].append(payload.decode(charset))
+        else:
+            filenames.append(part.get_filename() or "")
+    return {
+        "subject": TextDecoder.decode_header_text(msg.get("Subject", "")),
+        "text_body": "\n".join(bodies["text/plain"]),
+        "html_body": "\n".join(bodies["text/html"]),
+        "attachments": filenames,
+    }
+
+
+def fast_parse(raw: bytes) -> dict:
+    parsed = MessageParser(1 << 20, 1 << 22).parse(raw)
+    return {
+        "subject": parsed.subject,
+        "text_body": parsed.text_body,
+        "html_body": parsed.html_body,
+        "attachments": [attachment.filename for attachment in parsed.attachments],
+    }
+
+
+def multipart_message() -> bytes:
+    msg = MIMEMultipart("mixed")
+    msg["Subject"] = Header("Résumé attached", "utf-8")
+    alternative = MIMEMultipart("alternative")
+    alternative.attach(MIMEText("Hello\nplain body é", "plain", "utf-8"))
+    alternative.attach(MIMEText("<p>Hello <b>html</b></p>", "html", "latin-1"))
+    msg.attach(alternative)
+    pdf = MIMEApplication(b"%PDF-1.4 binary \x00\xff" * 50, "pdf")
+    pdf.add_header("Content-Disposition", "attachment", filename="cv.pdf")
+    msg.attach(pdf)
+    return msg.as_bytes()
+
+
+def nested_message() -> bytes:
+    inner = MIMEMultipart("alternative")
+    inner["Subject"] = "Inner"
+    inner.attach(MIMEText("forwarded text", "plain", "utf-8"))
+    inner.attach(MIMEText("<i>forwarded html</i>", "html", "utf-8"))
+    outer = MIMEMultipart("mixed")
+    outer["Subject"] = "Fwd: Inner"
+    outer.attach(MIMEText("see below", "plain", "us-ascii"))
+    outer.attach(MIMEMessage(inner))
+    return outer.as_bytes()
+
+
+def seven_bit_message(charset: str) -> bytes:
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = Header("件名テスト", charset)
+    msg.attach(MIMEText("本文テスト", "plain", charset))
+    return msg.as_bytes()
+
+
+def unpadded_base64_message() -> bytes:
+    return (
+        b"Subject: Unpadded\r\n"
+        b"Content-Type: text/plain; charset=utf-8\r\n"
+        b"Content-Transfer-Encoding: base64\r\n"
+        b"\r\n"
+        b"aGVsbG8gd29ybGQ\r\n"
+    )
+
+
+def boundary_prefix_message() -> bytes:
+    return (
+        b"Subject: Prefixed boundary\r\n"
+        b'Content-Type: multipart/mixed; boundary="sep"\r\n'
+        b"\r\n"
+        b"--sep\r\n"
+        b"Content-Type: text/plain\r\n"
+        b"\r\n"
+        b"outer text\r\n"
+        b"--sepX\r\n"
+        b"still outer text\r\n"
+        b"--sep \r\n"
+        b"Content-Type: text/html\r\n"
+        b"\r\n"
+        b"<p>html</p>\r\n"
+        b"--sep--\r\n"
+    )
+
+
+def truncated_message() -> bytes:
+    raw = multipart_message()
+    return raw[: raw.index(b"Content-Type: text/html")]
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        multipart_message(),
+        nested_message(),
+        seven_bit_message("iso-2022-jp"),
+        seven_bit_message("utf-7"),
+        unpadded_base64_message(),
+        boundary_prefix_message(),
+        truncated_message(),
+    ],
+    ids=[
+        "multipart",
+        "nested-rfc822",
+        "iso-2022-jp",
+        "utf-7",
+        "unpadded-base64",
+        "boundary-prefix",
+        "truncated",
+    ],
+)
+def test_message_parser_matches_stdlib(raw):
+    assert fast_parse(raw) == stdlib_parse(raw)
+
+
+def test_seven_bit_charset_is_decoded():
+    parsed = MessageParser(1 << 20, 1 << 22).parse(seven_bit_message("iso-2022-jp"))
+    assert parsed.subject == "件名テスト"
+    assert parsed.text_body == "本文テスト"
@@ -0,0 +1,51 @@
+from src.crawlers.rss import FeedParser
+
+
+RSS_FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/"
+     xmlns:dc="http://purl.org/dc/elements/1.1/">
+<channel><title>Feed</title><link>http://example.com/</link>
+<item>
+  <title>  Tom &amp; &lt;b&gt;Jerry&lt;/b&gt;  </title>
+  <link>http://example.com/a?x=1&amp;y=2</link>
+  <description><![CDATA[<p onclick="x()">Hi <a href="/rel">there</a><script>bad()</script></p>]]></description>
+  <content:encoded><![CDATA[<p>Full <b>body</b></p>]]></content:encoded>
+  <pubDate>Mon, 06 Sep 2021 16:45:00 +0200</pubDate>
+  <dc:creator>Caf\xc3\x83\xc2\xa9 Writer</dc:creator>
+</item>
+<item>
+  <guid>http://example.com/guid</guid>
+  <title>Second</title>
+  <dc:date>2020-01-01T10:00:00+05:00</dc:date>
+</item>
+</channel></rss>"""
+
+ATOM_FEED = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Feed</title>
+<entry>
+  <id>urn:uuid:1</id>
+  <title type="html">&lt;em&gt;Rich&lt;/em&gt;</title>
+  <link rel="self" href="http://example.com/self"/>
+  <link href="http://example.com/entry"/>
+  <updated>2024-01-02T03:04:05+02:00</updated>
+  <content type="html">&lt;p&gt;Body&lt;/p&gt;</content>
+  <author><name>N</name><email>n@example.com</email></author>
+</entry>
+<entry><id>urn:uuid:2</id><title>Only id</title><summary>Plain &lt;b&gt;text&lt;/b&gt;</summary></entry>
+</feed>"""
+
+
+def test_streaming_parser_matches_feedparser():
+    for feed in (RSS_FEED, ATOM_FEED):
+        parsed = FeedParser().parse(feed, "http://example.com/feed")
+        expected = FeedParser(streaming=False).parse(feed, "http://example.com/feed")
+        assert parsed.parser != "feedparser"
+        assert len(parsed.articles) == 2
+        assert parsed.articles == expected.articles
+
+
+def test_malformed_feed_falls_back_to_feedparser():
+    feed = b"<rss version='2.0'><channel><item><title>Broken &nbsp; entity</title></item></channel></rss>"
+    parsed = FeedParser().parse(feed, "http://example.com/feed")
+    assert parsed.parser == "feedparser"
+    assert parsed.articles == FeedParser(streaming=False).parse(feed, "http://example.com/feed").articles